@@ -42,8 +42,14 @@ class WebSocketService {
         (data) {
           try {
             final json = jsonDecode(data);
-            final message = WsMessage.fromJson(json);
-            _controller?.add(message);
+            // Telemetry and alerts arrive batched: {"type": "batch", "items": [...]}
+            if (json['type'] == 'batch') {
+              for (final item in json['items'] as List<dynamic>) {
+                _controller?.add(WsMessage.fromJson(item));
+              }
+            } else {
+              _controller?.add(WsMessage.fromJson(json));
+            }
           } catch (e) {
             debugPrint('WS parse error: $e');
           }
@@ -14,35 +14,55 @@ Args:
     --duration: Duration in seconds (default: 30)
     --broker: MQTT broker address (default: localhost)
     --port: MQTT broker port (default: 1883)
+    --workers: MQTT clients/threads sharing the devices (default: min(count, CPUs))
+    --qos: MQTT QoS level, 0 for throughput or 1 for acknowledged delivery (default: 0)
+    --verbose: Print every published reading (default: one summary line per second)
 """
 
 import argparse
-import json
+import os
 import random
+import threading
 import time
 from datetime import datetime, timezone
 
+import numpy as np
+import orjson
 import paho.mqtt.client as mqtt
 
+# Bound once so the publish loop skips the module attribute lookup
+_dumps = orjson.dumps
 
-def generate_temperature(base_temp: float = 37.5, variance: float = 2.0) -> float:
-    """Generate a realistic egg incubator temperature."""
-    return round(base_temp + random.uniform(-variance, variance), 2)
+# Publishing keeps the connection busy, so PINGREQs are rarely needed
+KEEPALIVE = 300
+
+# Temperatures are drawn per worker this many ticks at a time, so memory
+# stays bounded however long the run is
+TEMPERATURE_BLOCK_TICKS = 1024
+
+
+def generate_temperatures(
+    ticks: int,
+    count: int,
+    base_temp: float = 37.5,
+    variance: float = 2.0,
+) -> np.ndarray:
+    """Generate realistic egg incubator temperatures for every tick and device."""
+    rng = np.random.default_rng()
+    return rng.uniform(
+        base_temp - variance, base_temp + variance, size=(ticks, count)
+    ).round(2)
 
 
 def publish_telemetry(
     client: mqtt.Client,
-    device_id: str,
-    temp_c: float,
+    topic: str,
+    payload: dict,
+    qos: int = 0,
 ) -> bool:
     """Publish a telemetry message to MQTT."""
-    topic = f"egg/{device_id}/telemetry"
-    payload = {
-        "device_id": device_id,
-        "ts": datetime.now(timezone.utc).isoformat(),
-        "temp_c": temp_c,
-    }
-    result = client.publish(topic, json.dumps(payload), qos=1)
+    # orjson formats the datetime natively and returns UTF-8 bytes
+    result = client.publish(topic, _dumps(payload, option=orjson.OPT_UTC_Z), qos=qos)
     return result.rc == mqtt.MQTT_ERR_SUCCESS
 
 
@@ -59,6 +79,81 @@ def on_publish(client, userdata, mid, properties=None, reason_code=None):
     userdata["published"] += 1
 
 
+def create_client(client_id: str) -> mqtt.Client:
+    """Create an MQTT client with its own publish counter."""
+    client = mqtt.Client(
+        mqtt.CallbackAPIVersion.VERSION2,
+        client_id=client_id,
+        userdata={"published": 0},
+    )
+    client.on_connect = on_connect
+    client.on_publish = on_publish
+    # Let QoS 1 publishes pipeline instead of waiting on PUBACKs, and never
+    # drop queued messages; back off quickly when the broker restarts
+    client.max_inflight_messages_set(1000)
+    client.max_queued_messages_set(0)
+    client.reconnect_delay_set(min_delay=1, max_delay=8)
+    return client
+
+
+def run_worker(
+    client: mqtt.Client,
+    devices: list[str],
+    args: argparse.Namespace,
+    start_time: float,
+    stats: dict,
+    stop: threading.Event,
+) -> None:
+    """Publish readings for a shard of devices on its own MQTT client."""
+    interval = 1.0 / args.rate
+    total_ticks = int(args.duration * args.rate) + 1
+    tick_idx = 0
+    temps = None
+    sent = 0
+    failed = 0
+
+    # Topics are fixed per device and one payload dict is reused for
+    # every message, so the loop only updates its fields
+    topics = [(device_id, f"egg/{device_id}/telemetry") for device_id in devices]
+    payload = {"device_id": None, "ts": None, "temp_c": None}
+
+    # Sleep until the next scheduled tick rather than a fixed interval,
+    # so time spent publishing does not stretch the period
+    next_t = start_time
+
+    while (
+        not stop.is_set()
+        and time.monotonic() - start_time < args.duration
+        and tick_idx < total_ticks
+    ):
+        # One vectorized draw covers the next block of ticks: temps[tick, device]
+        row = tick_idx % TEMPERATURE_BLOCK_TICKS
+        if row == 0:
+            temps = generate_temperatures(
+                min(TEMPERATURE_BLOCK_TICKS, total_ticks - tick_idx), len(devices)
+            )
+        # tolist() yields plain floats for the whole tick in one call
+        for (device_id, topic), temp in zip(topics, temps[row].tolist()):
+            payload["device_id"] = device_id
+            payload["ts"] = datetime.now(timezone.utc)
+            payload["temp_c"] = temp
+            success = publish_telemetry(client, topic, payload, args.qos)
+            sent += 1
+            failed += 0 if success else 1
+            if args.verbose:
+                status = "✓" if success else "✗"
+                print(f"[{device_id}] {status} temp_c={temp}°C")
+
+        tick_idx += 1
+        stats["sent"] = sent
+        stats["failed"] = failed
+
+        next_t += interval
+        sleep_for = next_t - time.monotonic()
+        if sleep_for > 0:
+            stop.wait(sleep_for)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Simulate egg monitoring devices"
@@ -87,54 +182,91 @@ def main():
         "--prefix", type=str, default="eggpod",
         help="Device ID prefix (e.g., 'TEST' creates 'TEST-01')"
     )
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Number of MQTT clients, each publishing a shard of the devices "
+             "from its own thread (default: min(count, CPU count))"
+    )
+    parser.add_argument(
+        "--qos", type=int, choices=(0, 1), default=0,
+        help="MQTT QoS level (0 skips the per-message PUBACK round-trip)"
+    )
+    parser.add_argument(
+        "--verbose", action="store_true",
+        help="Print every published reading instead of a per-second summary"
+    )
     
     args = parser.parse_args()
     
     # Device IDs - use custom prefix if provided
     devices = [f"{args.prefix}-{i+1:02d}" if args.count > 1 else args.prefix 
                for i in range(args.count)]
+
+    # A single client serializes every publish through one socket, so the
+    # devices are split across several clients, one thread each
+    workers = args.workers or min(args.count, os.cpu_count() or 1)
+    workers = max(1, min(workers, args.count))
     
     # MQTT setup
-    userdata = {"published": 0}
-    client = mqtt.Client(
-        mqtt.CallbackAPIVersion.VERSION2,
-        client_id=f"simulator-{random.randint(1000, 9999)}",
-        userdata=userdata,
-    )
-    client.on_connect = on_connect
-    client.on_publish = on_publish
+    run_id = random.randint(1000, 9999)
+    clients = [create_client(f"simulator-{run_id}-{i}") for i in range(workers)]
     
     print(f"🥚 Egg Guardian Device Simulator")
     print(f"   Devices: {args.count}")
+    print(f"   Workers: {workers}")
     print(f"   Rate: {args.rate}/s per device")
     print(f"   Duration: {args.duration}s")
     print(f"   Broker: {args.broker}:{args.port}")
+    print(f"   QoS: {args.qos}")
     print()
     
+    stop = threading.Event()
+    stats = [{"sent": 0, "failed": 0} for _ in clients]
+    threads = []
+
     try:
-        client.connect(args.broker, args.port, 60)
-        client.loop_start()
-        
-        interval = 1.0 / args.rate
-        start_time = time.time()
-        
-        while time.time() - start_time < args.duration:
-            for device_id in devices:
-                temp = generate_temperature()
-                success = publish_telemetry(client, device_id, temp)
-                status = "✓" if success else "✗"
-                print(f"[{device_id}] {status} temp_c={temp}°C")
-            
-            time.sleep(interval)
+        for client in clients:
+            client.connect(args.broker, args.port, KEEPALIVE)
+            client.loop_start()
+
+        # Worker i owns devices[i::workers] and draws their temperatures
+        start_time = time.monotonic()
+
+        for i, client in enumerate(clients):
+            thread = threading.Thread(
+                target=run_worker,
+                args=(
+                    client,
+                    devices[i::workers],
+                    args,
+                    start_time,
+                    stats[i],
+                    stop,
+                ),
+                daemon=True,
+            )
+            thread.start()
+            threads.append(thread)
+
+        # Report aggregate progress once per second until every worker ends
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(timeout=1.0)
+                sent = sum(s["sent"] for s in stats)
+                failed = sum(s["failed"] for s in stats)
+                print(f"📤 sent={sent} failed={failed}")
         
         # Wait for publishes to complete
         time.sleep(1)
-        client.loop_stop()
-        client.disconnect()
+        for client in clients:
+            client.loop_stop()
+            client.disconnect()
         
         print()
         print(f"✅ Simulation complete!")
-        print(f"   Total messages published: {userdata['published']}")
+        published = sum(client.user_data_get()["published"] for client in clients)
+        print(f"   Total messages published: {published}")
+        print(f"   Publish failures: {sum(s['failed'] for s in stats)}")
         
     except ConnectionRefusedError:
         print(f"❌ Could not connect to MQTT broker at {args.broker}:{args.port}")
@@ -142,8 +274,12 @@ def main():
         return 1
     except KeyboardInterrupt:
         print("\n⏹️ Simulation stopped by user")
-        client.loop_stop()
-        client.disconnect()
+        stop.set()
+        for thread in threads:
+            thread.join()
+        for client in clients:
+            client.loop_stop()
+            client.disconnect()
     
     return 0
 
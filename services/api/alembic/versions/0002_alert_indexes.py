@@ -0,0 +1,57 @@
+"""Add indexes for the alert listing queries
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-14
+"""
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def _existing_indexes(table: str):
+    """Index names on a table, or None in offline mode (nothing to inspect)."""
+    if context.is_offline_mode():
+        return None
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _create_index(existing, name: str, table: str, columns, **kw) -> None:
+    # create_all on the current models already builds this revision's indexes
+    if existing is None or name not in existing:
+        op.create_index(name, table, columns, **kw)
+
+
+def _drop_index(existing, name: str, table: str) -> None:
+    if existing is None or name in existing:
+        op.drop_index(name, table_name=table)
+
+
+def upgrade() -> None:
+    existing = _existing_indexes("alerts")
+    _create_index(
+        existing, "ix_alerts_device_triggered", "alerts", ["device_id", "triggered_at"]
+    )
+    _create_index(existing, "ix_alerts_triggered_at", "alerts", ["triggered_at"])
+    _create_index(
+        existing,
+        "ix_alerts_unack_triggered",
+        "alerts",
+        ["triggered_at"],
+        postgresql_where=sa.text("is_acknowledged = false"),
+    )
+    # Covered by the leading column of ix_alerts_device_triggered
+    _drop_index(existing, "ix_alerts_device_id", "alerts")
+
+
+def downgrade() -> None:
+    op.create_index("ix_alerts_device_id", "alerts", ["device_id"])
+    op.drop_index("ix_alerts_unack_triggered", table_name="alerts")
+    op.drop_index("ix_alerts_triggered_at", table_name="alerts")
+    op.drop_index("ix_alerts_device_triggered", table_name="alerts")
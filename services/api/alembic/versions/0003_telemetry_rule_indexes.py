@@ -0,0 +1,57 @@
+"""Add telemetry device+time and alert rule device indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-14
+"""
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def _existing_indexes(table: str):
+    """Index names on a table, or None in offline mode (nothing to inspect)."""
+    if context.is_offline_mode():
+        return None
+    return {index["name"] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def _create_index(existing, name: str, table: str, columns, **kw) -> None:
+    # create_all on the current models already builds this revision's indexes
+    if existing is None or name not in existing:
+        op.create_index(name, table, columns, **kw)
+
+
+def _drop_index(existing, name: str, table: str) -> None:
+    if existing is None or name in existing:
+        op.drop_index(name, table_name=table)
+
+
+def upgrade() -> None:
+    telemetry = _existing_indexes("telemetry")
+    _create_index(
+        telemetry,
+        "ix_telemetry_device_recorded",
+        "telemetry",
+        ["device_id", "recorded_at"],
+    )
+    # Covered by the leading column of ix_telemetry_device_recorded
+    _drop_index(telemetry, "ix_telemetry_device_id", "telemetry")
+    _create_index(
+        _existing_indexes("alert_rules"),
+        "ix_alert_rules_device_id",
+        "alert_rules",
+        ["device_id"],
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_alert_rules_device_id", table_name="alert_rules")
+    op.create_index("ix_telemetry_device_id", "telemetry", ["device_id"])
+    op.drop_index("ix_telemetry_device_recorded", table_name="telemetry")
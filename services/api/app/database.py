@@ -1,22 +1,53 @@
 """Database configuration and session management."""
 
+import asyncio
+
+from sqlalchemy import text
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from app.config import get_settings
 
 settings = get_settings()
 
+engine_options = {}
+if make_url(settings.database_url).get_backend_name() == "postgresql":
+    # Size the pool for concurrent requests plus MQTT ingestion, and let
+    # asyncpg keep more prepared statements per connection. SQLite (tests)
+    # uses a static/singleton pool that rejects these options.
+    # JIT compilation only pays off for long analytical queries; for the
+    # short single-row statements issued here it just adds planning time.
+    engine_options.update(
+        poolclass=AsyncAdaptedQueuePool,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_recycle=settings.db_pool_recycle,
+        pool_pre_ping=True,
+        connect_args={
+            "prepared_statement_cache_size": 500,
+            "server_settings": {
+                "jit": "off",
+                "application_name": "egg-guardian",
+            },
+        },
+    )
+
 engine = create_async_engine(
     settings.database_url,
     echo=settings.debug,
     future=True,
+    **engine_options,
 )
 
+# Handlers flush explicitly where they need generated values, so the
+# implicit flush before every query is not needed
 async_session_maker = async_sessionmaker(
     engine,
     class_=AsyncSession,
     expire_on_commit=False,
+    autoflush=False,
 )
 
 
@@ -40,40 +71,33 @@ async def get_db() -> AsyncSession:
 
 
 async def init_db() -> None:
-    """Initialize database tables."""
+    """Create database tables if CREATE_TABLES_ON_START is enabled.
+
+    The schema is normally managed with Alembic (``alembic upgrade head``),
+    so by default worker start-up does no DDL at all.
+    """
+    if not settings.create_tables_on_start:
+        return
+
     # Import models to register them with Base
     from app.models import User, Device, Telemetry, AlertRule, Alert  # noqa: F401
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-    # Create default admin if no users exist
-    await create_default_admin()
-
 
-async def create_default_admin() -> None:
-    """Create a default admin user if no users exist."""
-    import logging
-    from sqlalchemy import select
-    from app.models import User
-    from app.services.auth import get_password_hash
+async def warm_pool() -> None:
+    """Open pool_size connections up front so early requests don't pay connect latency.
 
-    logger = logging.getLogger(__name__)
+    All connections are checked out at once (so each is a distinct new
+    connection), pinged, then returned to the pool.
+    """
+    if not isinstance(engine.pool, AsyncAdaptedQueuePool):
+        return
 
-    async with async_session_maker() as session:
-        # Check if any users exist
-        result = await session.execute(select(User).limit(1))
-        if result.scalar_one_or_none() is not None:
-            return  # Users already exist, skip
-
-        # Create default admin
-        admin = User(
-            email="admin@eggguardian.com",
-            hashed_password=get_password_hash("admin123"),
-            full_name="Default Admin",
-            is_active=True,
-            is_superuser=True,
-        )
-        session.add(admin)
-        await session.commit()
-        logger.info("✅ Created default admin: admin@eggguardian.com / admin123")
+    connections = [engine.connect() for _ in range(engine.pool.size())]
+    try:
+        await asyncio.gather(*(conn.start() for conn in connections))
+        await asyncio.gather(*(conn.execute(text("SELECT 1")) for conn in connections))
+    finally:
+        await asyncio.gather(*(conn.close() for conn in connections))
@@ -1,15 +1,19 @@
 """FastAPI application entry point."""
 
+import asyncio
+import importlib
 import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app.config import get_settings
-from app.database import init_db
-from app.routers import alerts, auth, devices, health, telemetry, users
-from app.services.mqtt import get_mqtt_service
+from app.database import init_db, warm_pool
+from app.middleware import FastPathMiddleware
+from app.services.cache import close_cache, init_cache
 
 settings = get_settings()
 
@@ -26,18 +30,31 @@ async def lifespan(app: FastAPI):
     """Application lifespan handler for startup and shutdown."""
     # Startup
     logger.info("Starting Egg Guardian API...")
+    # "uvloop" when started with --loop uvloop (see Dockerfile)
+    logger.info(f"Event loop: {type(asyncio.get_running_loop()).__module__}")
     await init_db()
-    logger.info("Database initialized")
+    await warm_pool()
+    await init_cache()
 
-    # Start MQTT service
-    mqtt_service = get_mqtt_service()
-    await mqtt_service.start()
+    # Start MQTT service (imported lazily so API-only deployments skip it)
+    mqtt_service = None
+    if settings.mqtt_enabled:
+        from app.services.mqtt import get_mqtt_service
+
+        mqtt_service = get_mqtt_service()
+        await mqtt_service.start()
+
+    # Build the OpenAPI schema now (FastAPI caches it on the app) rather
+    # than on the first /docs or /openapi.json request
+    app.openapi()
 
     yield
 
     # Shutdown
     logger.info("Shutting down Egg Guardian API...")
-    await mqtt_service.stop()
+    if mqtt_service is not None:
+        await mqtt_service.stop()
+    await close_cache()
 
 
 app = FastAPI(
@@ -45,8 +62,12 @@ app = FastAPI(
     description="Real-time egg temperature monitoring system",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
+# Compress larger JSON bodies (alert and telemetry lists)
+app.add_middleware(GZipMiddleware, minimum_size=512)
+
 # CORS middleware for Flutter web app
 # In development mode, allow all origins for easier testing
 # For production, set DEBUG=false and configure specific origins
@@ -70,10 +91,16 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include routers
-app.include_router(health.router)
-app.include_router(auth.router)
-app.include_router(devices.router)
-app.include_router(telemetry.router)
-app.include_router(users.router)
-app.include_router(alerts.router)
+# Include routers enabled in settings; disabled ones are never imported,
+# and a name listed twice is still registered only once
+ROUTER_NAMES = dict.fromkeys(
+    name.strip() for name in settings.enabled_routers.split(",") if name.strip()
+)
+for router_name in ROUTER_NAMES:
+    module = importlib.import_module(f"app.routers.{router_name}")
+    app.include_router(module.router)
+
+# Outermost: answer liveness probes and root redirects without running the
+# middleware above. Those are health endpoints, so only with that router.
+if "health" in ROUTER_NAMES:
+    app.add_middleware(FastPathMiddleware)
@@ -0,0 +1,53 @@
+"""ASGI middleware installed by the application."""
+
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+HEALTHY = {"status": "healthy"}
+
+
+class FastPathMiddleware:
+    """Answer GET / and GET /healthz before the rest of the middleware stack.
+
+    Added as the outermost middleware so liveness probes and crawlers hitting
+    the root skip CORS, gzip and routing and get prebuilt responses. It is
+    only installed with the health router, whose routes document the same
+    endpoints.
+    """
+
+    HEALTHZ_BODY = orjson.dumps(HEALTHY)
+    RESPONSES = {
+        "/": (
+            307,
+            [(b"location", b"/docs"), (b"content-length", b"0")],
+            b"",
+        ),
+        "/healthz": (
+            200,
+            [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(HEALTHZ_BODY)).encode()),
+            ],
+            HEALTHZ_BODY,
+        ),
+    }
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] == "http" and scope["method"] == "GET":
+            response = self.RESPONSES.get(scope["path"])
+            if response is not None:
+                status_code, headers, body = response
+                # Copy the headers: the server may add to the list it is given
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": status_code,
+                        "headers": list(headers),
+                    }
+                )
+                await send({"type": "http.response.body", "body": body})
+                return
+        await self.app(scope, receive, send)
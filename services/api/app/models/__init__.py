@@ -4,7 +4,17 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, DateTime, Float, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Boolean,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    Text,
+    text,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from sqlalchemy.sql import func
 
@@ -76,6 +86,11 @@ class Telemetry(Base):
     __tablename__ = "telemetry"
     __table_args__ = (
         # Composite index for common queries: get telemetry by device, ordered by time
+        # (WHERE device_id = ? AND recorded_at >= ? ORDER BY recorded_at DESC is a
+        # backward range scan; also serves plain device_id lookups). Not unique:
+        # a device may resend a timestamp, and one conflict would fail a whole
+        # ingest batch (COPY has no ON CONFLICT)
+        Index("ix_telemetry_device_recorded", "device_id", "recorded_at"),
         {
             "comment": "Temperature readings with device+time index for efficient queries"
         },
@@ -83,7 +98,7 @@ class Telemetry(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     device_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("devices.id"), nullable=False, index=True
+        Integer, ForeignKey("devices.id"), nullable=False
     )
     temp_c: Mapped[float] = mapped_column(Float, nullable=False)
     recorded_at: Mapped[datetime] = mapped_column(
@@ -104,7 +119,7 @@ class AlertRule(Base):
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     device_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("devices.id"), nullable=False
+        Integer, ForeignKey("devices.id"), nullable=False, index=True
     )
     temp_min: Mapped[float] = mapped_column(Float, nullable=False, default=35.0)
     temp_max: Mapped[float] = mapped_column(Float, nullable=False, default=39.0)
@@ -121,10 +136,23 @@ class Alert(Base):
     """Triggered alerts when temperature exceeds thresholds."""
 
     __tablename__ = "alerts"
+    __table_args__ = (
+        # Per-device history: WHERE device_id = ? ORDER BY triggered_at DESC
+        # (also serves plain device_id lookups, so no separate index)
+        Index("ix_alerts_device_triggered", "device_id", "triggered_at"),
+        # Newest-first listing of all alerts
+        Index("ix_alerts_triggered_at", "triggered_at"),
+        # Newest-first listing of unacknowledged alerts only
+        Index(
+            "ix_alerts_unack_triggered",
+            "triggered_at",
+            postgresql_where=text("is_acknowledged = false"),
+        ),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
     device_id: Mapped[int] = mapped_column(
-        Integer, ForeignKey("devices.id"), nullable=False, index=True
+        Integer, ForeignKey("devices.id"), nullable=False
     )
     rule_id: Mapped[int] = mapped_column(
         Integer, ForeignKey("alert_rules.id"), nullable=False
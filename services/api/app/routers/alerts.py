@@ -1,33 +1,149 @@
 """Alerts router for viewing and managing triggered alerts."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from typing import AsyncIterator, Optional
+
+import msgspec
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Select, delete, exists, func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timezone
 
 from app.database import get_db
 from app.models import Alert, Device, User
-from app.schemas import AlertResponse
+from app.schemas import AlertOut, AlertResponse
 from app.services.deps import get_current_user
 
 
 router = APIRouter(prefix="/api/v1/alerts", tags=["Alerts"])
 
+# Columns selected by the list endpoints, in AlertOut field order; plain
+# column rows skip ORM identity-map bookkeeping and can't trigger lazy loads
+ALERT_COLUMNS = (
+    Alert.id,
+    Alert.device_id,
+    Alert.rule_id,
+    Alert.temp_c,
+    Alert.alert_type,
+    Alert.message,
+    Alert.is_acknowledged,
+    Alert.triggered_at,
+    Alert.acknowledged_at,
+)
+
+_encode_alerts = msgspec.json.Encoder().encode
+
+# Lists longer than this are streamed in batches instead of built in memory
+STREAM_THRESHOLD = 500
+STREAM_BATCH_SIZE = 200
+
+
+def _timestamp_token(value: Optional[datetime]) -> int:
+    """Encode an optional timestamp as integer microseconds for an ETag."""
+    return int(value.timestamp() * 1_000_000) if value else 0
+
+
+async def _alerts_etag(
+    db: AsyncSession,
+    limit: int,
+    device_id: Optional[int] = None,
+    unacknowledged_only: bool = False,
+) -> str:
+    """Build a weak ETag for an alert listing from one aggregate query.
+
+    The aggregate only covers the rows the listing returns, found with the
+    same bounded index scan (newest ``limit`` by triggered_at). New and
+    deleted alerts change which ids are in that window, and
+    acknowledgements move the latest acknowledged_at (or, for
+    unacknowledged_only, drop the alert from the window).
+    """
+    window = select(Alert.id, Alert.acknowledged_at)
+    if device_id is not None:
+        window = window.where(Alert.device_id == device_id)
+    if unacknowledged_only:
+        window = window.where(Alert.is_acknowledged == False)
+    window = window.order_by(Alert.triggered_at.desc()).limit(limit).subquery()
+
+    query = select(
+        func.count(window.c.id),
+        func.coalesce(func.sum(window.c.id), 0),
+        func.max(window.c.acknowledged_at),
+    )
+    count, id_sum, last_acknowledged = (await db.execute(query)).one()
+    return f'W/"{limit}-{count}-{id_sum}-{_timestamp_token(last_acknowledged)}"'
+
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    """Check the request's If-None-Match header against an ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+
+async def _stream_alerts(bind, query: Select) -> AsyncIterator[bytes]:
+    """Yield a JSON array of alerts one ``STREAM_BATCH_SIZE`` partition at a time.
+
+    Runs after the request's get_db session has been closed, so it opens
+    its own session on the same engine.
+    """
+    yield b"["
+    first = True
+    async with AsyncSession(bind) as session:
+        result = await session.stream(
+            query.execution_options(yield_per=STREAM_BATCH_SIZE)
+        )
+        async for partition in result.partitions():
+            # Encode the partition as one array and strip its brackets
+            chunk = _encode_alerts([AlertOut(*row) for row in partition])[1:-1]
+            yield chunk if first else b"," + chunk
+            first = False
+    yield b"]"
+
+
+async def _alerts_response(
+    db: AsyncSession, query: Select, limit: int, etag: str
+) -> Response:
+    """Encode alert rows with msgspec, streaming when the limit is large."""
+    if limit > STREAM_THRESHOLD:
+        return StreamingResponse(
+            _stream_alerts(db.bind, query),
+            media_type="application/json",
+            headers={"ETag": etag},
+        )
+
+    result = await db.execute(query)
+    return Response(
+        content=_encode_alerts([AlertOut(*row) for row in result.all()]),
+        media_type="application/json",
+        headers={"ETag": etag},
+    )
+
 
 @router.get("", response_model=list[AlertResponse])
 async def list_alerts(
+    request: Request,
     db: AsyncSession = Depends(get_db),
     limit: int = 50,
     unacknowledged_only: bool = False,
 ):
-    """List all alerts, optionally filtering by acknowledgment status."""
-    query = select(Alert).order_by(Alert.triggered_at.desc()).limit(limit)
+    """List all alerts, optionally filtering by acknowledgment status.
+
+    Responses carry an ETag; polling clients that send it back in
+    If-None-Match get 304 Not Modified while nothing has changed.
+    """
+    etag = await _alerts_etag(db, limit, unacknowledged_only=unacknowledged_only)
+    if _etag_matches(request, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
+    query = select(*ALERT_COLUMNS).order_by(Alert.triggered_at.desc()).limit(limit)
     if unacknowledged_only:
         query = query.where(Alert.is_acknowledged == False)
 
-    result = await db.execute(query)
-    alerts = result.scalars().all()
-    return alerts
+    return await _alerts_response(db, query, limit, etag)
 
 
 @router.get("/{alert_id}", response_model=AlertResponse)
@@ -72,41 +188,43 @@ async def acknowledge_all_alerts(
     db: AsyncSession = Depends(get_db),
 ):
     """Acknowledge all unacknowledged alerts."""
-    result = await db.execute(select(Alert).where(Alert.is_acknowledged == False))
-    alerts = result.scalars().all()
-
-    now = datetime.now(timezone.utc)
-    for alert in alerts:
-        alert.is_acknowledged = True
-        alert.acknowledged_at = now
-
-    await db.flush()
-    return {"acknowledged": len(alerts)}
+    result = await db.execute(
+        update(Alert)
+        .where(Alert.is_acknowledged == False)
+        .values(is_acknowledged=True, acknowledged_at=datetime.now(timezone.utc))
+    )
+    return {"acknowledged": result.rowcount}
 
 
 @router.get("/device/{device_id}", response_model=list[AlertResponse])
 async def list_device_alerts(
     device_id: int,
+    request: Request,
     db: AsyncSession = Depends(get_db),
     limit: int = 20,
 ):
-    """List alerts for a specific device."""
+    """List alerts for a specific device (ETag/304 aware, like list_alerts)."""
     # Verify device exists
-    device_result = await db.execute(select(Device).where(Device.id == device_id))
-    if not device_result.scalar_one_or_none():
+    device_exists = await db.execute(select(exists().where(Device.id == device_id)))
+    if not device_exists.scalar():
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Device not found",
         )
 
-    result = await db.execute(
-        select(Alert)
+    etag = await _alerts_etag(db, limit, device_id=device_id)
+    if _etag_matches(request, etag):
+        return Response(
+            status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag}
+        )
+
+    query = (
+        select(*ALERT_COLUMNS)
         .where(Alert.device_id == device_id)
         .order_by(Alert.triggered_at.desc())
         .limit(limit)
     )
-    alerts = result.scalars().all()
-    return alerts
+    return await _alerts_response(db, query, limit, etag)
 
 
 @router.delete("/clear-acknowledged", status_code=status.HTTP_200_OK)
@@ -115,15 +233,8 @@ async def clear_acknowledged_alerts(
     current_user: User = Depends(get_current_user),
 ):
     """Delete all acknowledged alerts (authenticated)."""
-    result = await db.execute(select(Alert).where(Alert.is_acknowledged == True))
-    alerts = result.scalars().all()
-
-    count = len(alerts)
-    for alert in alerts:
-        await db.delete(alert)
-
-    await db.flush()
-    return {"deleted": count}
+    result = await db.execute(delete(Alert).where(Alert.is_acknowledged == True))
+    return {"deleted": result.rowcount}
 
 
 @router.delete("/delete-all", status_code=status.HTTP_200_OK)
@@ -132,12 +243,5 @@ async def delete_all_alerts(
     current_user: User = Depends(get_current_user),
 ):
     """Delete ALL alerts (authenticated)."""
-    result = await db.execute(select(Alert))
-    alerts = result.scalars().all()
-
-    count = len(alerts)
-    for alert in alerts:
-        await db.delete(alert)
-
-    await db.flush()
-    return {"deleted": count}
+    result = await db.execute(delete(Alert))
+    return {"deleted": result.rowcount}
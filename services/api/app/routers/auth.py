@@ -1,6 +1,6 @@
 """Authentication router with login, register, and token refresh."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
@@ -17,10 +17,11 @@ from app.services.auth import (
     create_access_token,
     create_refresh_token,
     create_user,
-    get_user_by_email,
+    email_exists,
     get_user_by_id,
     verify_token,
 )
+from app.services.cache import USERS_LIST_KEY, invalidate
 from app.services.deps import get_current_user
 
 router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
@@ -29,11 +30,11 @@ router = APIRouter(prefix="/api/v1/auth", tags=["Authentication"])
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(
     user_data: UserCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """Register a new user account."""
-    existing = await get_user_by_email(db, user_data.email)
-    if existing:
+    if await email_exists(db, user_data.email):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered",
@@ -45,6 +46,8 @@ async def register(
         password=user_data.password,
         full_name=user_data.full_name,
     )
+    # Background tasks run after get_db has committed
+    background_tasks.add_task(invalidate, USERS_LIST_KEY)
     return user
 
 
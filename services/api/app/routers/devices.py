@@ -2,22 +2,83 @@
 
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from sqlalchemy import delete, exists, insert, literal, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import get_settings
 from app.database import get_db
-from app.models import AlertRule, Device, User
+from app.models import Alert, AlertRule, Device, Telemetry, User
 from app.schemas import (
     AlertRuleCreate,
     AlertRuleResponse,
     DeviceCreate,
     DeviceResponse,
+    DeviceListAdapter,
     DeviceUpdate,
+    RuleListAdapter,
+)
+from app.services.cache import (
+    DEVICES_LIST_KEY,
+    DEVICES_LIST_TTL,
+    get_cached,
+    invalidate,
+    set_cached,
 )
 from app.services.deps import get_current_user, get_optional_user
 
 router = APIRouter(prefix="/api/v1/devices", tags=["Devices"])
+settings = get_settings()
+
+# Columns for the list endpoints: rows come back as mappings that
+# response_model validates directly, with no ORM objects built
+DEVICE_COLUMNS = (
+    Device.id,
+    Device.device_id,
+    Device.name,
+    Device.description,
+    Device.is_active,
+    Device.created_at,
+    Device.updated_at,
+)
+RULE_COLUMNS = (
+    AlertRule.id,
+    AlertRule.device_id,
+    AlertRule.temp_min,
+    AlertRule.temp_max,
+    AlertRule.is_active,
+    AlertRule.created_at,
+    Device.name.label("device_name"),
+)
+
+
+def _ingest_service():
+    """Return the MQTT ingest service, or None if ingestion is disabled."""
+    if not settings.mqtt_enabled:
+        return None
+    from app.services.mqtt import get_mqtt_service
+
+    return get_mqtt_service()
+
+
+def _forget_device(device_id: str, device_pk: int) -> None:
+    """Drop a device and its rules from the MQTT ingest caches."""
+    service = _ingest_service()
+    if service is not None:
+        service.invalidate_device(device_id)
+        service.invalidate_rules(device_pk)
+
+
+def _forget_rules(device_pk: int) -> None:
+    """Drop a device's rules from the MQTT ingest cache."""
+    service = _ingest_service()
+    if service is not None:
+        service.invalidate_rules(device_pk)
+
+
+def _json(content: bytes) -> Response:
+    """Wrap pre-serialized JSON bytes in a response."""
+    return Response(content=content, media_type="application/json")
 
 
 @router.get("", response_model=list[DeviceResponse])
@@ -25,24 +86,33 @@ async def list_devices(
     db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(get_optional_user),
 ):
-    """List all devices (public endpoint for MVP)."""
-    result = await db.execute(select(Device).order_by(Device.created_at.desc()))
-    devices = result.scalars().all()
-    return devices
+    """List all devices (public endpoint for MVP, cached when Redis is set)."""
+    cached = await get_cached(DEVICES_LIST_KEY)
+    if cached is not None:
+        return _json(cached)
+
+    result = await db.execute(
+        select(*DEVICE_COLUMNS).order_by(Device.created_at.desc())
+    )
+    devices = DeviceListAdapter.validate_python(result.mappings().all())
+    content = DeviceListAdapter.dump_json(devices)
+    await set_cached(DEVICES_LIST_KEY, content, DEVICES_LIST_TTL)
+    return _json(content)
 
 
 @router.post("", response_model=DeviceResponse, status_code=status.HTTP_201_CREATED)
 async def create_device(
     device_data: DeviceCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: Optional[User] = Depends(get_optional_user),
 ):
     """Register a new device."""
     # Check if device_id already exists
     existing = await db.execute(
-        select(Device).where(Device.device_id == device_data.device_id)
+        select(exists().where(Device.device_id == device_data.device_id))
     )
-    if existing.scalar_one_or_none():
+    if existing.scalar():
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Device with ID '{device_data.device_id}' already exists",
@@ -57,6 +127,8 @@ async def create_device(
     db.add(device)
     await db.flush()
     await db.refresh(device)
+    # Background tasks run after get_db has committed
+    background_tasks.add_task(invalidate, DEVICES_LIST_KEY)
     return device
 
 
@@ -80,6 +152,7 @@ async def get_device(
 async def update_device(
     device_id: int,
     device_data: DeviceUpdate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
@@ -102,25 +175,37 @@ async def update_device(
 
     await db.flush()
     await db.refresh(device)
+    background_tasks.add_task(invalidate, DEVICES_LIST_KEY)
+    background_tasks.add_task(_forget_device, device.device_id, device.id)
     return device
 
 
 @router.delete("/{device_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_device(
     device_id: int,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
-    """Delete a device (authenticated)."""
-    result = await db.execute(select(Device).where(Device.id == device_id))
-    device = result.scalar_one_or_none()
-    if not device:
+    """Delete a device and its telemetry, rules and alerts (authenticated).
+
+    Bulk deletes replace the ORM cascade, which loaded every child row
+    only to delete it one by one.
+    """
+    for child in (Alert, AlertRule, Telemetry):
+        await db.execute(delete(child).where(child.device_id == device_id))
+
+    result = await db.execute(
+        delete(Device).where(Device.id == device_id).returning(Device.device_id)
+    )
+    deleted_device_id = result.scalar_one_or_none()
+    if deleted_device_id is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Device not found",
         )
-
-    await db.delete(device)
+    background_tasks.add_task(invalidate, DEVICES_LIST_KEY)
+    background_tasks.add_task(_forget_device, deleted_device_id, device_id)
 
 
 # ============== Alert Rules ==============
@@ -132,23 +217,12 @@ async def list_all_rules(
 ):
     """List all alert rules across all devices (bulk fetch to avoid N+1)."""
     result = await db.execute(
-        select(AlertRule, Device.name)
+        select(*RULE_COLUMNS)
         .join(Device, AlertRule.device_id == Device.id)
         .order_by(Device.name, AlertRule.id)
     )
-    rules = []
-    for rule, device_name in result.all():
-        rule_dict = {
-            "id": rule.id,
-            "device_id": rule.device_id,
-            "temp_min": rule.temp_min,
-            "temp_max": rule.temp_max,
-            "is_active": rule.is_active,
-            "created_at": rule.created_at,
-            "device_name": device_name,
-        }
-        rules.append(rule_dict)
-    return rules
+    rules = RuleListAdapter.validate_python(result.mappings().all())
+    return _json(RuleListAdapter.dump_json(rules))
 
 
 @router.get("/{device_id}/rules", response_model=list[AlertRuleResponse])
@@ -156,17 +230,30 @@ async def list_device_rules(
     device_id: int,
     db: AsyncSession = Depends(get_db),
 ):
-    """List alert rules for a device."""
-    # Verify device exists
-    device_result = await db.execute(select(Device).where(Device.id == device_id))
-    if not device_result.scalar_one_or_none():
+    """List alert rules for a device.
+
+    One outer join both checks that the device exists (no rows) and
+    returns its rules with device_name filled in.
+    """
+    result = await db.execute(
+        select(*RULE_COLUMNS)
+        .select_from(Device)
+        .outerjoin(AlertRule, AlertRule.device_id == Device.id)
+        .where(Device.id == device_id)
+        .order_by(AlertRule.id)
+    )
+    rows = result.mappings().all()
+    if not rows:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Device not found",
         )
 
-    result = await db.execute(select(AlertRule).where(AlertRule.device_id == device_id))
-    return result.scalars().all()
+    # A device without rules yields one row of NULL rule columns
+    rules = RuleListAdapter.validate_python(
+        [row for row in rows if row["id"] is not None]
+    )
+    return _json(RuleListAdapter.dump_json(rules))
 
 
 @router.post(
@@ -177,32 +264,43 @@ async def list_device_rules(
 async def create_device_rule(
     device_id: int,
     rule_data: AlertRuleCreate,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """Create an alert rule for a device."""
-    # Verify device exists
-    device_result = await db.execute(select(Device).where(Device.id == device_id))
-    if not device_result.scalar_one_or_none():
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Device not found",
-        )
-
-    # Validate min < max
+    # Validate min < max; an unknown device still takes precedence as a 404,
+    # but the lookup is only paid on this already-failing path
     if rule_data.temp_min >= rule_data.temp_max:
+        if not await db.scalar(select(exists().where(Device.id == device_id))):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Device not found",
+            )
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="temp_min must be less than temp_max",
         )
 
-    rule = AlertRule(
-        device_id=device_id,
-        temp_min=rule_data.temp_min,
-        temp_max=rule_data.temp_max,
+    # INSERT ... SELECT ... WHERE EXISTS inserts nothing for an unknown device,
+    # so the existence check and the insert share one round-trip
+    rule_values = select(
+        literal(device_id),
+        literal(rule_data.temp_min),
+        literal(rule_data.temp_max),
+        literal(True),
+    ).where(exists().where(Device.id == device_id))
+    result = await db.execute(
+        insert(AlertRule)
+        .from_select(["device_id", "temp_min", "temp_max", "is_active"], rule_values)
+        .returning(AlertRule)
     )
-    db.add(rule)
-    await db.flush()
-    await db.refresh(rule)
+    rule = result.scalar_one_or_none()
+    if not rule:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Device not found",
+        )
+    background_tasks.add_task(_forget_rules, device_id)
     return rule
 
 
@@ -210,20 +308,21 @@ async def create_device_rule(
 async def delete_device_rule(
     device_id: int,
     rule_id: int,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
 ):
     """Delete an alert rule."""
     result = await db.execute(
-        select(AlertRule).where(
+        delete(AlertRule)
+        .where(
             AlertRule.id == rule_id,
             AlertRule.device_id == device_id,
         )
+        .returning(AlertRule.id)
     )
-    rule = result.scalar_one_or_none()
-    if not rule:
+    if result.scalar_one_or_none() is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Alert rule not found",
         )
-
-    await db.delete(rule)
+    background_tasks.add_task(_forget_rules, device_id)
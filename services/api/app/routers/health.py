@@ -1,13 +1,22 @@
 """Health check and root endpoints."""
 
 from pathlib import Path
-from fastapi import APIRouter
-from fastapi.responses import FileResponse, RedirectResponse
+
+from fastapi import APIRouter, Response
+from fastapi.responses import RedirectResponse
+
+from app.middleware import HEALTHY
 
 router = APIRouter(tags=["Health"])
 
 STATIC_DIR = Path(__file__).parent.parent / "static"
 
+# Read once at import instead of stat()-ing the file on every request
+try:
+    FAVICON = (STATIC_DIR / "favicon.png").read_bytes()
+except FileNotFoundError:
+    FAVICON = None
+
 
 @router.get("/", include_in_schema=False)
 async def root():
@@ -18,9 +27,8 @@ async def root():
 @router.get("/favicon.ico", include_in_schema=False)
 async def favicon():
     """Serve favicon."""
-    favicon_path = STATIC_DIR / "favicon.png"
-    if favicon_path.exists():
-        return FileResponse(favicon_path, media_type="image/png")
+    if FAVICON is not None:
+        return Response(FAVICON, media_type="image/png")
     return RedirectResponse(url="/docs")
 
 
@@ -31,4 +39,4 @@ async def health_check():
     
     Returns 200 OK if the service is healthy.
     """
-    return {"status": "healthy"}
+    return HEALTHY
@@ -1,51 +1,163 @@
 """Telemetry router with history and WebSocket endpoints."""
 
 import asyncio
+import contextlib
+import logging
+from collections import defaultdict
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
-from sqlalchemy import select
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, WebSocketDisconnect, status
+from sqlalchemy import and_, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
 from app.models import Device, Telemetry
-from app.schemas import TelemetryHistory, TelemetryResponse
+from app.schemas import TelemetryHistory
 
 router = APIRouter(prefix="/api/v1", tags=["Telemetry"])
 
+logger = logging.getLogger(__name__)
+
+# Seconds a single WebSocket send may take before the client is dropped
+SEND_TIMEOUT = 1.0
+
+# Broadcasts are coalesced per device into {"type": "batch", "items": [...]}
+# frames, flushed every BATCH_INTERVAL seconds or once BATCH_MAX_SIZE
+# messages are pending for a device
+BATCH_INTERVAL = 0.1
+BATCH_MAX_SIZE = 64
+
+
 # WebSocket connection manager
 class ConnectionManager:
     """Manages WebSocket connections per device."""
 
     def __init__(self):
-        self.active_connections: dict[str, list[WebSocket]] = {}
+        # Sets keep connect/disconnect O(1) under reconnect storms
+        self.active_connections: dict[str, set[WebSocket]] = {}
+        self._pending: defaultdict[str, list[bytes]] = defaultdict(list)
+        self._flusher: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the background task that flushes batched broadcasts."""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._run_flusher())
+
+    async def stop(self):
+        """Stop the flusher, sending whatever is still pending."""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush()
+
+    async def _run_flusher(self):
+        while True:
+            await asyncio.sleep(BATCH_INTERVAL)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Error flushing WebSocket batches: {e}")
 
     async def connect(self, websocket: WebSocket, device_id: str):
         await websocket.accept()
-        if device_id not in self.active_connections:
-            self.active_connections[device_id] = []
-        self.active_connections[device_id].append(websocket)
+        self.active_connections.setdefault(device_id, set()).add(websocket)
 
     def disconnect(self, websocket: WebSocket, device_id: str):
-        if device_id in self.active_connections:
-            self.active_connections[device_id].remove(websocket)
-            if not self.active_connections[device_id]:
+        connections = self.active_connections.get(device_id)
+        if connections is not None:
+            connections.discard(websocket)
+            if not connections:
                 del self.active_connections[device_id]
 
+    def has_subscribers(self, device_id: str) -> bool:
+        """Whether any connection is watching a device (or "all")."""
+        return device_id in self.active_connections
+
+    async def _send(self, targets: list[tuple[str, WebSocket]], payload: str):
+        """Send a pre-encoded text frame to every target concurrently.
+
+        Connections that fail or take longer than SEND_TIMEOUT are dropped
+        and closed so one slow client can't stall the rest.
+        """
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(connection.send_text(payload), SEND_TIMEOUT)
+                for _, connection in targets
+            ),
+            return_exceptions=True,
+        )
+        failed = []
+        for (device_id, connection), result in zip(targets, results):
+            if isinstance(result, Exception):
+                self.disconnect(connection, device_id)
+                failed.append(connection)
+        if failed:
+            # Close them too, so the client notices and reconnects instead
+            # of sitting on a live but silent socket
+            await asyncio.gather(*(self._close(connection) for connection in failed))
+
+    async def _close(self, connection: WebSocket):
+        with contextlib.suppress(Exception):
+            await asyncio.wait_for(
+                connection.close(code=status.WS_1011_INTERNAL_ERROR), SEND_TIMEOUT
+            )
+
     async def broadcast_to_device(self, device_id: str, message: dict):
-        """Broadcast message to all connections watching a device."""
-        if device_id in self.active_connections:
-            for connection in self.active_connections[device_id]:
-                try:
-                    await connection.send_json(message)
-                except Exception:
-                    pass  # Connection may be closed
+        """Queue a message for every connection watching a device.
+
+        It is sent with the device's next batch; messages for devices
+        nobody is watching are dropped.
+        """
+        if self.has_subscribers(device_id):
+            await self.broadcast_bytes(device_id, orjson.dumps(message))
+
+    async def broadcast_bytes(self, device_id: str, blob: bytes):
+        """Queue an already orjson-encoded message, like broadcast_to_device.
+
+        Callers fanning one message out to several devices encode it once;
+        batch frames are assembled from the encoded fragments.
+        """
+        if not self.has_subscribers(device_id):
+            return
+        pending = self._pending[device_id]
+        pending.append(blob)
+        if len(pending) >= BATCH_MAX_SIZE:
+            await self._flush_device(device_id)
+
+    async def flush(self):
+        """Send every device's pending messages as one batch frame each."""
+        if self._pending:
+            await asyncio.gather(
+                *(self._flush_device(device_id) for device_id in list(self._pending))
+            )
+
+    async def _flush_device(self, device_id: str):
+        items = self._pending.pop(device_id, None)
+        if items:
+            frame = b'{"type":"batch","items":[' + b",".join(items) + b"]}"
+            await self._send_to_device(device_id, frame.decode())
+
+    async def _send_to_device(self, device_id: str, payload: str):
+        connections = self.active_connections.get(device_id)
+        if connections:
+            targets = [(device_id, connection) for connection in connections]
+            await self._send(targets, payload)
 
     async def broadcast_all(self, message: dict):
-        """Broadcast to all connections."""
-        for device_id in self.active_connections:
-            await self.broadcast_to_device(device_id, message)
+        """Broadcast to all connections, encoding the message only once."""
+        targets = [
+            (device_id, connection)
+            for device_id, connections in self.active_connections.items()
+            for connection in connections
+        ]
+        if targets:
+            await self._send(targets, orjson.dumps(message).decode())
 
 
 # Global connection manager
@@ -64,33 +176,40 @@ async def get_device_telemetry(
     limit: int = Query(default=1000, ge=1, le=10000),
     db: AsyncSession = Depends(get_db),
 ):
-    """Get telemetry history for a device."""
-    # Get device
-    result = await db.execute(select(Device).where(Device.id == device_id))
-    device = result.scalar_one_or_none()
-    if not device:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Device not found",
-        )
+    """Get telemetry history for a device.
 
-    # Get telemetry within time window
+    The device and its readings come from one LEFT JOIN: no rows means the
+    device doesn't exist, a NULL reading means it has none in the window.
+    """
     since = datetime.now(timezone.utc) - timedelta(hours=hours)
-    telemetry_result = await db.execute(
-        select(Telemetry)
-        .where(Telemetry.device_id == device_id)
-        .where(Telemetry.recorded_at >= since)
+    result = await db.execute(
+        select(Device.device_id, Device.name, Telemetry)
+        .outerjoin(
+            Telemetry,
+            and_(Telemetry.device_id == Device.id, Telemetry.recorded_at >= since),
+        )
+        .where(Device.id == device_id)
         .order_by(Telemetry.recorded_at.desc())
         .limit(limit)
     )
-    readings = telemetry_result.scalars().all()
+    rows = result.all()
+    if not rows:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Device not found",
+        )
 
-    return TelemetryHistory(
-        device_id=device.device_id,
-        device_name=device.name,
-        readings=[TelemetryResponse.model_validate(r) for r in readings],
-        count=len(readings),
+    # Validate the ORM rows once and dump straight to JSON bytes
+    readings = [reading for _, _, reading in rows if reading is not None]
+    history = TelemetryHistory.model_validate(
+        {
+            "device_id": rows[0].device_id,
+            "device_name": rows[0].name,
+            "readings": readings,
+            "count": len(readings),
+        }
     )
+    return Response(content=history.model_dump_json(), media_type="application/json")
 
 
 @router.websocket("/ws/{device_id}")
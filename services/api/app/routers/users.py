@@ -1,27 +1,76 @@
 """User management router for admin."""
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Response, status
+from sqlalchemy import delete, exists, func, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.database import get_db
-from app.models import User
-from app.schemas import UserResponse
+from app.models import Device, User
+from app.schemas import UserListAdapter, UserResponse
+from app.services.cache import (
+    USERS_LIST_KEY,
+    USERS_LIST_TTL,
+    get_cached,
+    invalidate,
+    set_cached,
+)
 from app.services.deps import get_current_superuser
 
 
 router = APIRouter(prefix="/api/v1/users", tags=["Users"])
 
+# Number of admins, as a scalar subquery that can ride along with a user
+# lookup; correlate(None) stops it from correlating to the outer users table
+ADMIN_COUNT = (
+    select(func.count())
+    .select_from(User)
+    .where(User.is_superuser == True)
+    .correlate(None)
+    .scalar_subquery()
+)
+
+
+async def _get_user_and_admin_count(db: AsyncSession, user_id: int) -> tuple[User, int]:
+    """Fetch a user and the current admin count in one query, or raise 404."""
+    result = await db.execute(select(User, ADMIN_COUNT).where(User.id == user_id))
+    row = result.one_or_none()
+    if not row:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found",
+        )
+    return row[0], row[1]
+
 
 @router.get("", response_model=list[UserResponse])
 async def list_users(
     db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(get_current_superuser),
 ):
-    """List all registered users (admin only)."""
-    result = await db.execute(select(User).order_by(User.created_at.desc()))
-    users = result.scalars().all()
-    return users
+    """List all registered users (admin only, cached when Redis is set).
+
+    The cached list is the same for every admin, and get_current_superuser
+    runs before the cache is consulted.
+    """
+    cached = await get_cached(USERS_LIST_KEY)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+
+    # Only the UserResponse columns (never hashed_password), as mappings
+    result = await db.execute(
+        select(
+            User.id,
+            User.email,
+            User.full_name,
+            User.is_active,
+            User.is_superuser,
+            User.created_at,
+        ).order_by(User.created_at.desc())
+    )
+    users = UserListAdapter.validate_python(result.mappings().all())
+    content = UserListAdapter.dump_json(users)
+    await set_cached(USERS_LIST_KEY, content, USERS_LIST_TTL)
+    return Response(content=content, media_type="application/json")
 
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -44,56 +93,62 @@ async def get_user(
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_user(
     user_id: int,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(get_current_superuser),
 ):
     """Delete a user (admin only). Cannot delete the last admin."""
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if not user:
+    # Detach the user's devices, as the ORM delete used to
+    await db.execute(
+        update(Device).where(Device.owner_id == user_id).values(owner_id=None)
+    )
+
+    # The last-admin guard is part of the DELETE itself
+    result = await db.execute(
+        delete(User)
+        .where(User.id == user_id)
+        .where(or_(User.is_superuser == False, ADMIN_COUNT > 1))
+        .returning(User.id)
+    )
+    if result.scalar_one_or_none() is not None:
+        # Background tasks run after get_db has committed
+        background_tasks.add_task(invalidate, USERS_LIST_KEY)
+        return
+
+    # Nothing deleted: tell a missing user apart from the last admin
+    # (the rollback in get_db restores the detached devices)
+    user_exists = await db.execute(select(exists().where(User.id == user_id)))
+    if not user_exists.scalar():
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found",
         )
-
-    # Protect last admin
-    if user.is_superuser:
-        admin_count = await db.execute(select(User).where(User.is_superuser == True))
-        if len(admin_count.scalars().all()) <= 1:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot delete the last admin. Promote another user first.",
-            )
-
-    await db.delete(user)
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Cannot delete the last admin. Promote another user first.",
+    )
 
 
 @router.patch("/{user_id}/toggle-admin", response_model=UserResponse)
 async def toggle_admin_status(
     user_id: int,
+    background_tasks: BackgroundTasks,
     db: AsyncSession = Depends(get_db),
     admin_user: User = Depends(get_current_superuser),
 ):
     """Toggle admin (superuser) status for a user (admin only). Cannot demote the last admin."""
-    result = await db.execute(select(User).where(User.id == user_id))
-    user = result.scalar_one_or_none()
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found",
-        )
+    user, admin_count = await _get_user_and_admin_count(db, user_id)
 
     # Protect last admin from being demoted
-    if user.is_superuser:
-        admin_count = await db.execute(select(User).where(User.is_superuser == True))
-        if len(admin_count.scalars().all()) <= 1:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Cannot demote the last admin. Promote another user first.",
-            )
+    if user.is_superuser and admin_count <= 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot demote the last admin. Promote another user first.",
+        )
 
     # Toggle is_superuser
     user.is_superuser = not user.is_superuser
     await db.flush()
     await db.refresh(user)
+    background_tasks.add_task(invalidate, USERS_LIST_KEY)
     return user
@@ -1,9 +1,10 @@
 """Pydantic schemas for API request/response validation."""
 
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 
-from pydantic import BaseModel, EmailStr, Field
+import msgspec
+from pydantic import BaseModel, EmailStr, Field, TypeAdapter
 
 
 # ============== Auth Schemas ==============
@@ -173,13 +174,46 @@ class AlertResponse(BaseModel):
         from_attributes = True
 
 
+class AlertOut(msgspec.Struct):
+    """msgspec mirror of AlertResponse for encoding alert lists.
+
+    Fields are in the order of ALERT_COLUMNS in the alerts router, so a
+    result row maps positionally onto AlertOut(*row).
+    """
+
+    id: int
+    device_id: int
+    rule_id: int
+    temp_c: float
+    alert_type: str
+    message: str
+    is_acknowledged: bool
+    triggered_at: datetime
+    acknowledged_at: Optional[datetime]
+
+
 # ============== WebSocket Schemas ==============
 
 
+def _now_utc() -> datetime:
+    """Timezone-aware replacement for the deprecated datetime.utcnow."""
+    return datetime.now(timezone.utc)
+
+
 class WebSocketMessage(BaseModel):
     """WebSocket message format."""
 
     type: str  # "telemetry", "alert", "status"
     device_id: str
     data: dict
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=_now_utc)
+
+
+# ============== Response Adapters ==============
+
+# Built once at import; list endpoints validate and dump_json() through
+# these and return the bytes directly, bypassing FastAPI's per-request
+# response_model handling
+DeviceListAdapter = TypeAdapter(list[DeviceResponse])
+UserListAdapter = TypeAdapter(list[UserResponse])
+RuleListAdapter = TypeAdapter(list[AlertRuleResponse])
@@ -1,11 +1,17 @@
 """Authentication service with JWT tokens."""
 
+import asyncio
+import math
+import threading
+import time
 from datetime import datetime, timedelta, timezone
+from hashlib import blake2b
 from typing import Optional
 
+from cachetools import TTLCache
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy import select
+from sqlalchemy import exists, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
@@ -13,50 +19,82 @@ from app.models import User
 
 settings = get_settings()
 
+# Token settings never change at runtime; resolve them once for the
+# per-request encode/decode calls
+JWT_SECRET_KEY = settings.jwt_secret_key
+JWT_ALGORITHM = settings.jwt_algorithm
+JWT_ALGORITHMS = [settings.jwt_algorithm]
+ACCESS_TOKEN_EXPIRE = timedelta(minutes=settings.access_token_expire_minutes)
+REFRESH_TOKEN_EXPIRE = timedelta(days=settings.refresh_token_expire_days)
+
+# Decoded tokens, so repeat requests with the same token skip the HMAC check
+TOKEN_CACHE_TTL = 60
+_token_cache: TTLCache = TTLCache(maxsize=8192, ttl=TOKEN_CACHE_TTL)
+_token_cache_lock = threading.Lock()
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password against its hash.
+
+    bcrypt takes ~100 ms of CPU, so it runs in a worker thread instead of
+    blocking the event loop.
+    """
+    return await asyncio.to_thread(pwd_context.verify, plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
-    """Hash a password."""
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    """Hash a password (in a worker thread, like verify_password)."""
+    return await asyncio.to_thread(pwd_context.hash, password)
 
 
 def create_access_token(user_id: int) -> str:
     """Create a JWT access token."""
-    expire = datetime.now(timezone.utc) + timedelta(
-        minutes=settings.access_token_expire_minutes
-    )
+    expire = datetime.now(timezone.utc) + ACCESS_TOKEN_EXPIRE
     to_encode = {"sub": str(user_id), "exp": expire, "type": "access"}
-    return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    return jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 
 def create_refresh_token(user_id: int) -> str:
     """Create a JWT refresh token."""
-    expire = datetime.now(timezone.utc) + timedelta(
-        days=settings.refresh_token_expire_days
-    )
+    expire = datetime.now(timezone.utc) + REFRESH_TOKEN_EXPIRE
     to_encode = {"sub": str(user_id), "exp": expire, "type": "refresh"}
-    return jwt.encode(to_encode, settings.jwt_secret_key, algorithm=settings.jwt_algorithm)
+    return jwt.encode(to_encode, JWT_SECRET_KEY, algorithm=JWT_ALGORITHM)
 
 
-def verify_token(token: str, token_type: str = "access") -> Optional[int]:
-    """Verify a JWT token and return user ID."""
+def _decode_token(token: str, token_type: str) -> tuple[Optional[int], float]:
+    """Decode a JWT token, returning (user ID or None, expiry timestamp)."""
     try:
-        payload = jwt.decode(
-            token, settings.jwt_secret_key, algorithms=[settings.jwt_algorithm]
-        )
+        payload = jwt.decode(token, JWT_SECRET_KEY, algorithms=JWT_ALGORITHMS)
         if payload.get("type") != token_type:
-            return None
+            return None, math.inf
         user_id = int(payload.get("sub"))
-        return user_id
+        return user_id, payload.get("exp", math.inf)
     except (JWTError, ValueError):
+        return None, math.inf
+
+
+def verify_token(token: str, token_type: str = "access") -> Optional[int]:
+    """Verify a JWT token and return user ID.
+
+    Results are cached for TOKEN_CACHE_TTL seconds, keyed on a digest of
+    the token so long JWTs don't sit in memory; the token's own exp is
+    still checked on every hit.
+    """
+    key = (blake2b(token.encode(), digest_size=16).digest(), token_type)
+    with _token_cache_lock:
+        cached = _token_cache.get(key)
+    if cached is None:
+        cached = _decode_token(token, token_type)
+        with _token_cache_lock:
+            _token_cache[key] = cached
+
+    user_id, expires_at = cached
+    if user_id is not None and time.time() >= expires_at:
         return None
+    return user_id
 
 
 async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
@@ -65,6 +103,12 @@ async def get_user_by_email(db: AsyncSession, email: str) -> Optional[User]:
     return result.scalar_one_or_none()
 
 
+async def email_exists(db: AsyncSession, email: str) -> bool:
+    """Check whether an email is registered, without loading the user."""
+    result = await db.execute(select(exists().where(User.email == email)))
+    return bool(result.scalar())
+
+
 async def get_user_by_id(db: AsyncSession, user_id: int) -> Optional[User]:
     """Get user by ID."""
     result = await db.execute(select(User).where(User.id == user_id))
@@ -75,7 +119,7 @@ async def create_user(
     db: AsyncSession, email: str, password: str, full_name: Optional[str] = None
 ) -> User:
     """Create a new user."""
-    hashed_password = get_password_hash(password)
+    hashed_password = await get_password_hash(password)
     user = User(
         email=email,
         hashed_password=hashed_password,
@@ -94,6 +138,6 @@ async def authenticate_user(
     user = await get_user_by_email(db, email)
     if not user:
         return None
-    if not verify_password(password, user.hashed_password):
+    if not await verify_password(password, user.hashed_password):
         return None
     return user
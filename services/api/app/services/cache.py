@@ -0,0 +1,72 @@
+"""Redis cache for serialized, non-user-specific list responses.
+
+Caching is off unless REDIS_URL is set; every helper then degrades to a
+no-op, and Redis errors are logged rather than failing the request.
+"""
+
+import logging
+from typing import Optional
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Keys hold the exact JSON bytes returned by the list endpoints
+DEVICES_LIST_KEY = "egg-guardian:devices:list"
+USERS_LIST_KEY = "egg-guardian:users:list"
+DEVICES_LIST_TTL = 30
+USERS_LIST_TTL = 60
+
+_redis = None
+
+
+async def init_cache() -> None:
+    """Connect to Redis if REDIS_URL is configured."""
+    global _redis
+    if not settings.redis_url or _redis is not None:
+        return
+
+    from redis.asyncio import Redis
+
+    _redis = Redis.from_url(settings.redis_url)
+    logger.info("Response cache enabled")
+
+
+async def close_cache() -> None:
+    """Close the Redis connection pool."""
+    global _redis
+    if _redis is not None:
+        await _redis.aclose()
+        _redis = None
+
+
+async def get_cached(key: str) -> Optional[bytes]:
+    """Return cached bytes for a key, or None on a miss."""
+    if _redis is None:
+        return None
+    try:
+        return await _redis.get(key)
+    except Exception as e:
+        logger.warning(f"Cache read failed for {key}: {e}")
+        return None
+
+
+async def set_cached(key: str, value: bytes, ttl: int) -> None:
+    """Store bytes under a key for ttl seconds."""
+    if _redis is None:
+        return
+    try:
+        await _redis.set(key, value, ex=ttl)
+    except Exception as e:
+        logger.warning(f"Cache write failed for {key}: {e}")
+
+
+async def invalidate(*keys: str) -> None:
+    """Drop cached entries; call after the mutation has committed."""
+    if _redis is None:
+        return
+    try:
+        await _redis.delete(*keys)
+    except Exception as e:
+        logger.warning(f"Cache invalidation failed for {keys}: {e}")
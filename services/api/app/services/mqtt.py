@@ -1,69 +1,177 @@
 """MQTT service for ingesting telemetry from devices."""
 
 import asyncio
-import json
 import logging
+import os
 from datetime import datetime, timezone
-from typing import Optional
+from collections import defaultdict
+from operator import itemgetter
+from typing import Dict, List, Optional, Set, Tuple
 
+import numpy as np
+import orjson
 from aiomqtt import Client, MqttError
-from sqlalchemy import select
+from cachetools import LRUCache, TTLCache
+from sqlalchemy import insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.config import get_settings
 from app.database import async_session_maker
 from app.models import Alert, AlertRule, Device, Telemetry
 from app.routers.telemetry import get_connection_manager
+from app.services.cache import DEVICES_LIST_KEY, invalidate
+
+try:
+    from ciso8601 import parse_datetime as parse_timestamp
+except ImportError:
+    # Python 3.11+ parses the trailing "Z" itself
+    parse_timestamp = datetime.fromisoformat
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+TELEMETRY_TOPIC = "egg/+/telemetry"
+# With MQTT_SHARED_SUBSCRIPTION, every shard runs a client in one shared
+# subscription and the broker hands each message to just one of them. Only
+# the receiving process broadcasts it, so this is meant for a single API
+# worker, not for several WebSocket-serving workers
+SHARED_TOPIC = f"$share/eggingest/{TELEMETRY_TOPIC}"
+
+TOPIC_PREFIX = "egg/"
+TOPIC_SUFFIX = "/telemetry"
+TOPIC_PREFIX_LEN = len(TOPIC_PREFIX)
+TOPIC_SUFFIX_LEN = len(TOPIC_SUFFIX)
+
+# Messages handled concurrently across all shards
+HANDLER_CONCURRENCY = 64
+
+# Payloads larger than this are parsed in a worker thread. These always use
+# orjson: the shared simdjson parser is not thread-safe
+OFFLOAD_PAYLOAD_SIZE = 4096
+
+# Readings are queued per shard and written in micro-batches: one
+# transaction per INGEST_BATCH_SIZE readings or INGEST_BATCH_INTERVAL seconds
+INGEST_QUEUE_SIZE = 10000
+INGEST_BATCH_SIZE = 500
+INGEST_BATCH_INTERVAL = 0.05
+
+# device_id -> Device.id for devices already seen, so steady-state batches
+# skip the device lookup entirely
+DEVICE_CACHE_SIZE = 10000
+
+# Batches at least this large are written with COPY on PostgreSQL
+COPY_THRESHOLD = 100
+
+# Device.id -> RuleArrays of the device's active rules. Rule endpoints
+# invalidate this worker's entry; the TTL bounds staleness in other workers
+RULE_CACHE_SIZE = 10000
+RULE_CACHE_TTL = 60
+
+# (device_id, temp_c, recorded_at)
+Reading = Tuple[str, float, datetime]
+# (device_id, alert_type, temp_c, message)
+FiredAlert = Tuple[str, str, float, str]
+# A device's active rules as parallel (rule_ids, temp_mins, temp_maxes) arrays
+RuleArrays = Tuple[np.ndarray, np.ndarray, np.ndarray]
+NO_RULES: RuleArrays = (np.empty(0, np.int64), np.empty(0), np.empty(0))
+
 
 class MQTTService:
     """MQTT client service for telemetry ingestion."""
 
     def __init__(self):
         self.running = False
-        self._task: Optional[asyncio.Task] = None
+        self._tasks: List[asyncio.Task] = []
+        self._flushers: List[asyncio.Task] = []
+        # Messages are handled as tasks, at most HANDLER_CONCURRENCY at once;
+        # the set keeps references to them until they finish
+        self._handler_slots = asyncio.Semaphore(HANDLER_CONCURRENCY)
+        self._handlers: Set[asyncio.Task] = set()
+        # topic -> set once its latest handled message has been queued
+        self._topic_tails: Dict[str, asyncio.Event] = {}
+        # Resolved once rather than per message
+        self._ws_manager = get_connection_manager()
+        self._broker = settings.mqtt_broker
+        self._port = settings.mqtt_port
+        # Readings are routed to a shard by device and queued in arrival order
+        # per topic (see _handle_message), so each device's readings are
+        # persisted in order by a single flusher. With a shared subscription
+        # the broker may split one topic across clients, which can reorder it.
+        self._shards = settings.mqtt_shards or os.cpu_count() or 1
+        self._queues: List[asyncio.Queue] = [
+            asyncio.Queue(maxsize=INGEST_QUEUE_SIZE) for _ in range(self._shards)
+        ]
+        # A plain subscription needs a single client: one per shard would
+        # receive every message once per shard
+        if settings.mqtt_shared_subscription:
+            self._topic, self._clients = SHARED_TOPIC, self._shards
+        else:
+            self._topic, self._clients = TELEMETRY_TOPIC, 1
+        self._device_cache: LRUCache = LRUCache(maxsize=DEVICE_CACHE_SIZE)
+        self._rule_cache: TTLCache = TTLCache(maxsize=RULE_CACHE_SIZE, ttl=RULE_CACHE_TTL)
+        # simdjson parsers are not thread-safe; one per service, reused per message
+        self._parser = None
+        if settings.mqtt_simdjson:
+            try:
+                import simdjson
+
+                self._parser = simdjson.Parser()
+            except ImportError:
+                logger.warning("MQTT_SIMDJSON is set but pysimdjson is not installed; using orjson")
 
     async def start(self):
         """Start the MQTT subscription service."""
         if self.running:
             return
         self.running = True
-        self._task = asyncio.create_task(self._run())
-        logger.info("MQTT service started")
+        self._ws_manager.start()
+        self._tasks = [asyncio.create_task(self._run()) for _ in range(self._clients)]
+        self._flushers = [asyncio.create_task(self._run_flusher(queue)) for queue in self._queues]
+        logger.info(f"MQTT service started with {self._shards} shards")
 
     async def stop(self):
         """Stop the MQTT subscription service."""
         self.running = False
-        if self._task:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        # Let in-flight messages reach their queues before draining them
+        await asyncio.gather(*self._handlers, return_exceptions=True)
+        # Flushers exit once their queued readings are persisted
+        await asyncio.gather(*self._flushers)
+        self._flushers = []
+        await self._ws_manager.stop()
         logger.info("MQTT service stopped")
 
+    def invalidate_device(self, device_id: str):
+        """Forget a cached device so the next reading looks it up again."""
+        self._device_cache.pop(device_id, None)
+
+    def invalidate_rules(self, device_pk: int):
+        """Forget a device's cached alert rules after they change."""
+        self._rule_cache.pop(device_pk, None)
+
     async def _run(self):
-        """Main MQTT subscription loop with reconnection."""
+        """One shard's MQTT subscription loop with reconnection."""
         while self.running:
             try:
-                async with Client(
-                    settings.mqtt_broker,
-                    port=settings.mqtt_port,
-                ) as client:
+                async with Client(self._broker, port=self._port) as client:
                     # Subscribe to all device telemetry topics
-                    await client.subscribe("egg/+/telemetry")
-                    logger.info(f"Subscribed to egg/+/telemetry on {settings.mqtt_broker}:{settings.mqtt_port}")
+                    await client.subscribe(self._topic)
+                    logger.info(f"Subscribed to {self._topic} on {self._broker}:{self._port}")
 
                     async for message in client.messages:
                         if not self.running:
                             break
-                        try:
-                            await self._handle_message(message)
-                        except Exception as e:
-                            logger.error(f"Error handling message: {e}")
+                        # Wait here while HANDLER_CONCURRENCY messages are in
+                        # flight, so handler tasks can't pile up unbounded
+                        await self._handler_slots.acquire()
+                        task = asyncio.create_task(self._handle_in_background(message))
+                        self._handlers.add(task)
+                        task.add_done_callback(self._handlers.discard)
 
             except MqttError as e:
                 logger.error(f"MQTT connection error: {e}")
@@ -74,158 +182,412 @@ class MQTTService:
                 if self.running:
                     await asyncio.sleep(5)
 
+    async def _handle_in_background(self, message):
+        """Handle one message as a task, then free its concurrency slot."""
+        try:
+            await self._handle_message(message)
+        except Exception as e:
+            logger.error("Error handling message: %s", e)
+        finally:
+            self._handler_slots.release()
+
     async def _handle_message(self, message):
         """Process incoming MQTT message."""
+        # Messages on one topic are parsed concurrently but queued in arrival
+        # order: each waits until the topic's previous message is queued (or
+        # dropped). Handler tasks start in the order _run created them, so
+        # this runs in arrival order, before the first await.
+        topic = message.topic.value
+        previous = self._topic_tails.get(topic)
+        done = self._topic_tails[topic] = asyncio.Event()
+        try:
+            reading = await self._read_message(message)
+            if previous is not None:
+                await previous.wait()
+            if reading is not None:
+                # Persisted by the device's shard; blocks the MQTT loop when full
+                queue = self._queues[hash(reading[0]) % self._shards]
+                await queue.put(reading)
+        finally:
+            done.set()
+            if self._topic_tails.get(topic) is done:
+                del self._topic_tails[topic]
+
+    async def _read_message(self, message) -> Optional[Reading]:
+        """Parse a telemetry message, or log and return None if it is invalid."""
         try:
-            # Parse topic to extract device_id
-            topic_parts = message.topic.value.split("/")
-            if len(topic_parts) != 3 or topic_parts[0] != "egg" or topic_parts[2] != "telemetry":
-                logger.warning(f"Invalid topic format: {message.topic}")
-                return
-
-            mqtt_device_id = topic_parts[1]
-
-            # Parse payload
-            payload = json.loads(message.payload.decode())
-            device_id = payload.get("device_id", mqtt_device_id)
-            temp_c = float(payload["temp_c"])
-            
-            # Parse timestamp
-            ts_str = payload.get("ts")
-            if ts_str:
-                recorded_at = datetime.fromisoformat(ts_str.replace("Z", "+00:00"))
+            # Extract device_id from egg/<device_id>/telemetry without splitting
+            topic = message.topic.value
+            mqtt_device_id = topic[TOPIC_PREFIX_LEN:-TOPIC_SUFFIX_LEN]
+            if (
+                not topic.startswith(TOPIC_PREFIX)
+                or not topic.endswith(TOPIC_SUFFIX)
+                or not mqtt_device_id
+                or "/" in mqtt_device_id
+            ):
+                logger.warning("Invalid topic format: %s", topic)
+                return None
+
+            raw = message.payload
+            if len(raw) > OFFLOAD_PAYLOAD_SIZE:
+                # Keep the loop pumping MQTT while a large payload is parsed
+                device_id, temp_c, ts_str = await asyncio.to_thread(
+                    _parse_payload, raw, mqtt_device_id
+                )
             else:
-                recorded_at = datetime.now(timezone.utc)
+                device_id, temp_c, ts_str = self._read_payload(raw, mqtt_device_id)
 
-            logger.debug(f"Received telemetry: device={device_id}, temp={temp_c}°C")
+            recorded_at = parse_timestamp(ts_str) if ts_str else datetime.now(timezone.utc)
 
-            # Persist to database
-            async with async_session_maker() as db:
-                await self._persist_telemetry(db, device_id, temp_c, recorded_at)
-                await db.commit()
+            logger.debug("Received telemetry: device=%s, temp=%s°C", device_id, temp_c)
+            return device_id, temp_c, recorded_at
 
-        except json.JSONDecodeError as e:
-            logger.error(f"Invalid JSON payload: {e}")
+        except ValueError as e:
+            logger.error("Invalid telemetry payload: %s", e)
         except KeyError as e:
-            logger.error(f"Missing required field: {e}")
+            logger.error("Missing required field: %s", e)
         except Exception as e:
-            logger.error(f"Error processing telemetry: {e}")
+            logger.error("Error processing telemetry: %s", e)
+        return None
 
-    async def _persist_telemetry(
+    async def _run_flusher(self, queue: asyncio.Queue):
+        """Persist a shard's readings in batches until stopped and drained.
+
+        The shard keeps one session for its lifetime, with one transaction
+        per batch; it is only replaced after a failed batch.
+        """
+        db = async_session_maker()
+        try:
+            while self.running or not queue.empty():
+                batch = await self._next_batch(queue)
+                if not batch:
+                    continue
+                try:
+                    await self._flush(db, batch)
+                except Exception as e:
+                    logger.error("Error persisting telemetry batch: %s", e)
+                    await db.close()
+                    db = async_session_maker()
+        finally:
+            await db.close()
+
+    async def _next_batch(self, queue: asyncio.Queue) -> List[Reading]:
+        """Collect up to INGEST_BATCH_SIZE readings within INGEST_BATCH_INTERVAL."""
+        try:
+            first = await asyncio.wait_for(queue.get(), INGEST_BATCH_INTERVAL)
+        except asyncio.TimeoutError:
+            return []
+
+        batch = [first]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + INGEST_BATCH_INTERVAL
+        while len(batch) < INGEST_BATCH_SIZE:
+            try:
+                batch.append(queue.get_nowait())
+                continue
+            except asyncio.QueueEmpty:
+                pass
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    def _read_payload(
+        self, raw: bytes, mqtt_device_id: str
+    ) -> Tuple[str, float, Optional[str]]:
+        """Extract (device_id, temp_c, ts) from a telemetry payload.
+
+        A simdjson document is only valid until the parser is reused, so
+        every field is copied out here before returning.
+        """
+        if self._parser is not None:
+            return _payload_fields(self._parser.parse(raw), mqtt_device_id)
+        return _parse_payload(raw, mqtt_device_id)
+
+    async def _flush(self, db: AsyncSession, batch: List[Reading]):
+        """Persist one micro-batch in a single transaction, then broadcast."""
+        try:
+            registered, alerts = await self._commit_batch(db, batch)
+        except Exception as e:
+            # A device or rule deleted through another worker stays in this
+            # worker's caches, and its stale id fails the batch's inserts.
+            # The caches are now cleared, so retry once rather than dropping
+            # every other device's readings.
+            logger.warning("Retrying telemetry batch after error: %s", e)
+            registered, alerts = await self._commit_batch(db, batch, resolve_all=True)
+        if registered:
+            await invalidate(DEVICES_LIST_KEY)
+
+        # Broadcast to WebSocket clients only once the rows are committed.
+        # Each message is built and encoded once, and only if someone is
+        # watching.
+        ws_manager = self._ws_manager
+        watch_all = ws_manager.has_subscribers("all")
+        for device_id, temp_c, recorded_at in batch:
+            watched = ws_manager.has_subscribers(device_id)
+            if not (watched or watch_all):
+                continue
+            message = {
+                "type": "telemetry",
+                "device_id": device_id,
+                "data": {
+                    "temp_c": temp_c,
+                    "recorded_at": recorded_at.isoformat(),
+                },
+            }
+            blob = orjson.dumps(message)
+            if watched:
+                await ws_manager.broadcast_bytes(device_id, blob)
+            if watch_all:
+                await ws_manager.broadcast_bytes("all", blob)
+
+        for device_id, alert_type, temp_c, text in alerts:
+            watched = ws_manager.has_subscribers(device_id)
+            if not (watched or watch_all):
+                continue
+            message = {
+                "type": "alert",
+                "device_id": device_id,
+                "data": {
+                    "alert_type": alert_type,
+                    "temp_c": temp_c,
+                    "message": text,
+                },
+            }
+            blob = orjson.dumps(message)
+            if watched:
+                await ws_manager.broadcast_bytes(device_id, blob)
+            if watch_all:
+                await ws_manager.broadcast_bytes("all", blob)
+
+    async def _commit_batch(
         self,
         db: AsyncSession,
-        device_id: str,
-        temp_c: float,
-        recorded_at: datetime,
-    ):
-        """Persist telemetry to database and check alerts."""
-        # Get or create device
-        result = await db.execute(
-            select(Device).where(Device.device_id == device_id)
-        )
-        device = result.scalar_one_or_none()
-
-        if not device:
-            # Auto-register device if it doesn't exist
-            device = Device(
-                device_id=device_id,
-                name=f"Auto-registered: {device_id}",
+        batch: List[Reading],
+        resolve_all: bool = False,
+    ) -> Tuple[bool, List[FiredAlert]]:
+        """Run _persist_batch in its own transaction.
+
+        On failure both caches are cleared: they may hold stale ids, or
+        devices registered in the rolled-back transaction.
+        """
+        try:
+            async with db.begin():
+                return await self._persist_batch(db, batch, resolve_all)
+        except Exception:
+            self._device_cache.clear()
+            self._rule_cache.clear()
+            raise
+
+    async def _persist_batch(
+        self,
+        db: AsyncSession,
+        batch: List[Reading],
+        resolve_all: bool = False,
+    ) -> Tuple[bool, List[FiredAlert]]:
+        """Add a batch of readings and any alerts they trigger to the session.
+
+        With resolve_all, every device's id comes from the registration
+        upsert's RETURNING instead of the cache or a SELECT, so a device
+        deleted in the meantime is registered again rather than failing
+        the batch's inserts.
+
+        Returns whether a device was (possibly) auto-registered, and the
+        fired alerts as (device_id, alert_type, temp_c, message) tuples.
+        """
+        # Resolve uncached devices in the batch with one query
+        device_pks = {}
+        uncached = set()
+        for device_id, _, _ in batch:
+            pk = None if resolve_all else self._device_cache.get(device_id)
+            if pk is None:
+                uncached.add(device_id)
+            else:
+                device_pks[device_id] = pk
+
+        missing = list(uncached) if resolve_all else []
+        if uncached and not resolve_all:
+            result = await db.execute(
+                select(Device.device_id, Device.id).where(Device.device_id.in_(uncached))
             )
-            db.add(device)
-            await db.flush()
-            logger.info(f"Auto-registered device: {device_id}")
-
-        # Create telemetry record
-        telemetry = Telemetry(
-            device_id=device.id,
-            temp_c=temp_c,
-            recorded_at=recorded_at,
-        )
-        db.add(telemetry)
-        await db.flush()
-
-        # Broadcast to WebSocket clients
-        ws_manager = get_connection_manager()
-        await ws_manager.broadcast_to_device(device_id, {
-            "type": "telemetry",
-            "device_id": device_id,
-            "data": {
-                "temp_c": temp_c,
-                "recorded_at": recorded_at.isoformat(),
-            },
-        })
-        # Also broadcast to "all" subscribers
-        await ws_manager.broadcast_to_device("all", {
-            "type": "telemetry",
-            "device_id": device_id,
-            "data": {
+            found = dict(result.all())
+            device_pks.update(found)
+            self._device_cache.update(found)
+            missing = [device_id for device_id in uncached if device_id not in found]
+
+        if missing:
+            # Auto-register devices that don't exist yet. The no-op update on
+            # conflict makes RETURNING report the id of a device another
+            # worker registered first, rather than failing the batch.
+            dialect_insert = pg_insert if db.bind.dialect.name == "postgresql" else sqlite_insert
+            stmt = dialect_insert(Device).values([
+                {"device_id": device_id, "name": f"Auto-registered: {device_id}"}
+                for device_id in missing
+            ])
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[Device.device_id],
+                set_={"device_id": stmt.excluded.device_id},
+            ).returning(Device.device_id, Device.id)
+            result = await db.execute(stmt)
+            for device_id, pk in result.all():
+                device_pks[device_id] = pk
+                self._device_cache[device_id] = pk
+                if not resolve_all:
+                    logger.info("Auto-registered device: %s", device_id)
+
+        # Load active rules for devices not in the rule cache, in one query.
+        # The batch is evaluated from this local copy: storing the loaded rules
+        # can evict other devices' entries from the cache, and entries can
+        # expire while the query is awaited.
+        rules_by_pk = {}
+        uncached_pks = set()
+        for pk in set(device_pks.values()):
+            rules = self._rule_cache.get(pk)
+            if rules is None:
+                uncached_pks.add(pk)
+            else:
+                rules_by_pk[pk] = rules
+        if uncached_pks:
+            result = await db.execute(
+                select(AlertRule.device_id, AlertRule.id, AlertRule.temp_min, AlertRule.temp_max)
+                .where(AlertRule.device_id.in_(uncached_pks))
+                .where(AlertRule.is_active == True)
+                .order_by(AlertRule.id)
+            )
+            loaded = {pk: [] for pk in uncached_pks}
+            for pk, rule_id, temp_min, temp_max in result.all():
+                loaded[pk].append((rule_id, temp_min, temp_max))
+            # Devices without rules are cached too, as empty arrays
+            for pk, rules in loaded.items():
+                packed = _pack_rules(rules) if rules else NO_RULES
+                rules_by_pk[pk] = self._rule_cache[pk] = packed
+
+        # Check each device's readings in the batch against all of its rules
+        # in one vectorized comparison
+        readings_by_device = defaultdict(list)
+        for index, (device_id, _, _) in enumerate(batch):
+            readings_by_device[device_pks[device_id]].append(index)
+        temps = None
+        hits = []
+        for pk, indexes in readings_by_device.items():
+            rules = rules_by_pk[pk]
+            if not rules[0].size:
+                continue
+            if temps is None:
+                temps = np.fromiter(
+                    (temp_c for _, temp_c, _ in batch), dtype=np.float64, count=len(batch)
+                )
+            for reading, rule_id, alert_type, bound in self._check_alerts(
+                temps[indexes], rules
+            ):
+                hits.append((indexes[reading], rule_id, alert_type, bound))
+        # Back into batch order
+        hits.sort(key=itemgetter(0))
+
+        # Formatting and rows only for the (rare) readings that fired
+        alerts = []
+        alert_rows = []
+        for index, rule_id, alert_type, bound in hits:
+            device_id, temp_c, _ = batch[index]
+            if alert_type == "low":
+                message = f"Temperature {temp_c}°C is below minimum {bound}°C"
+            else:
+                message = f"Temperature {temp_c}°C is above maximum {bound}°C"
+            alert_rows.append({
+                "device_id": device_pks[device_id],
+                "rule_id": rule_id,
                 "temp_c": temp_c,
-                "recorded_at": recorded_at.isoformat(),
-            },
-        })
-
-        # Check alert rules
-        await self._check_alerts(db, device, temp_c, ws_manager)
-
-    async def _check_alerts(
+                "alert_type": alert_type,
+                "message": message,
+            })
+            logger.warning("Alert triggered for %s: %s", device_id, message)
+            alerts.append((device_id, alert_type, temp_c, message))
+        if alert_rows:
+            await db.execute(insert(Alert), alert_rows)
+
+        await self._insert_telemetry(db, [
+            (device_pks[device_id], temp_c, recorded_at)
+            for device_id, temp_c, recorded_at in batch
+        ])
+        return bool(missing), alerts
+
+    async def _insert_telemetry(
         self,
         db: AsyncSession,
-        device: Device,
-        temp_c: float,
-        ws_manager,
+        rows: List[Tuple[int, float, datetime]],
     ):
-        """Check if temperature triggers any alert rules."""
-        result = await db.execute(
-            select(AlertRule)
-            .where(AlertRule.device_id == device.id)
-            .where(AlertRule.is_active == True)
-        )
-        rules = result.scalars().all()
-
-        for rule in rules:
-            alert_type = None
-            message = None
-
-            if temp_c < rule.temp_min:
-                alert_type = "low"
-                message = f"Temperature {temp_c}°C is below minimum {rule.temp_min}°C"
-            elif temp_c > rule.temp_max:
-                alert_type = "high"
-                message = f"Temperature {temp_c}°C is above maximum {rule.temp_max}°C"
-
-            if alert_type:
-                # Create alert
-                alert = Alert(
-                    device_id=device.id,
-                    rule_id=rule.id,
-                    temp_c=temp_c,
-                    alert_type=alert_type,
-                    message=message,
-                )
-                db.add(alert)
-                await db.flush()
-
-                logger.warning(f"Alert triggered for {device.device_id}: {message}")
-
-                # Broadcast alert
-                await ws_manager.broadcast_to_device(device.device_id, {
-                    "type": "alert",
-                    "device_id": device.device_id,
-                    "data": {
-                        "alert_type": alert_type,
-                        "temp_c": temp_c,
-                        "message": message,
-                    },
-                })
-                await ws_manager.broadcast_to_device("all", {
-                    "type": "alert",
-                    "device_id": device.device_id,
-                    "data": {
-                        "alert_type": alert_type,
-                        "temp_c": temp_c,
-                        "message": message,
-                    },
-                })
+        """Write (Device.id, temp_c, recorded_at) rows to the telemetry table.
+
+        Large batches on PostgreSQL use COPY. It runs last, after the
+        batch's other statements, so it joins the transaction they started;
+        when it is the batch's only write it stands on its own.
+        """
+        if len(rows) >= COPY_THRESHOLD and db.bind.dialect.name == "postgresql":
+            conn = await db.connection()
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                Telemetry.__tablename__,
+                records=rows,
+                columns=["device_id", "temp_c", "recorded_at"],
+            )
+            return
+
+        # Core executemany: no ORM objects, which are never read back here
+        await db.execute(insert(Telemetry), [
+            {"device_id": pk, "temp_c": temp_c, "recorded_at": recorded_at}
+            for pk, temp_c, recorded_at in rows
+        ])
+
+    def _check_alerts(
+        self,
+        temps: np.ndarray,
+        rules: RuleArrays,
+    ) -> List[Tuple[int, int, str, float]]:
+        """Compare a device's readings against all of its rules at once.
+
+        Returns (reading, rule_id, alert_type, bound) for every violated
+        rule, where reading indexes into temps and bound is the crossed
+        temp_min or temp_max.
+        """
+        rule_ids, mins, maxes = rules
+        low = temps[:, None] < mins
+        high = temps[:, None] > maxes
+        readings, fired = np.nonzero(low | high)
+
+        hits = []
+        for reading, rule in zip(readings.tolist(), fired.tolist()):
+            if low[reading, rule]:
+                hits.append((reading, int(rule_ids[rule]), "low", float(mins[rule])))
+            else:
+                hits.append((reading, int(rule_ids[rule]), "high", float(maxes[rule])))
+        return hits
+
+
+def _payload_fields(doc, mqtt_device_id: str) -> Tuple[str, float, Optional[str]]:
+    """Copy (device_id, temp_c, ts) out of a parsed payload document."""
+    device_id = str(doc.get("device_id", mqtt_device_id))
+    temp_c = float(doc["temp_c"])
+    ts_str = doc.get("ts")
+    return device_id, temp_c, str(ts_str) if ts_str else None
+
+
+def _parse_payload(raw: bytes, mqtt_device_id: str) -> Tuple[str, float, Optional[str]]:
+    """Parse a payload with orjson; stateless, so safe in worker threads."""
+    return _payload_fields(orjson.loads(raw), mqtt_device_id)
+
+
+def _pack_rules(rules: List[Tuple[int, float, float]]) -> RuleArrays:
+    """Pack (rule_id, temp_min, temp_max) rows into parallel arrays."""
+    rule_ids, mins, maxes = zip(*rules) if rules else ((), (), ())
+    return (
+        np.array(rule_ids, dtype=np.int64),
+        np.array(mins, dtype=np.float64),
+        np.array(maxes, dtype=np.float64),
+    )
 
 
 # Global MQTT service instance
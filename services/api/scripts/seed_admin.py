@@ -0,0 +1,51 @@
+"""Create the default admin user if no users exist.
+
+Run once per deployment, after migrations, from services/api:
+
+    python -m scripts.seed_admin
+"""
+
+import asyncio
+import logging
+
+from sqlalchemy import exists, select
+
+from app.database import async_session_maker, engine
+from app.models import User
+from app.services.auth import get_password_hash
+
+logger = logging.getLogger(__name__)
+
+
+async def create_default_admin() -> None:
+    """Create a default admin user if no users exist."""
+    async with async_session_maker() as session:
+        # Check if any users exist
+        result = await session.execute(select(exists().select_from(User)))
+        if result.scalar():
+            logger.info("Users already exist, skipping default admin")
+            return
+
+        # Create default admin
+        admin = User(
+            email="admin@eggguardian.com",
+            hashed_password=await get_password_hash("admin123"),
+            full_name="Default Admin",
+            is_active=True,
+            is_superuser=True,
+        )
+        session.add(admin)
+        await session.commit()
+        logger.info("✅ Created default admin: admin@eggguardian.com / admin123")
+
+
+async def main() -> None:
+    try:
+        await create_default_admin()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(main())
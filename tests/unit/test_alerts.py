@@ -0,0 +1,124 @@
+"""Unit tests for alert endpoints."""
+
+from datetime import datetime, timezone
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Alert, AlertRule, Device
+from app.schemas import AlertResponse
+
+
+@pytest_asyncio.fixture
+async def seeded_alerts(db_session: AsyncSession) -> Device:
+    """Create a device with one rule and three alerts (one acknowledged)."""
+    device = Device(device_id="alert-test", name="Alert Test")
+    db_session.add(device)
+    await db_session.flush()
+
+    rule = AlertRule(device_id=device.id, temp_min=35.0, temp_max=39.0)
+    db_session.add(rule)
+    await db_session.flush()
+
+    db_session.add_all(
+        [
+            Alert(
+                device_id=device.id,
+                rule_id=rule.id,
+                temp_c=40.0 + i,
+                alert_type="high",
+                message=f"Alert {i}",
+                is_acknowledged=(i == 0),
+            )
+            for i in range(3)
+        ]
+    )
+    await db_session.commit()
+    return device
+
+
+@pytest.mark.asyncio
+async def test_list_alerts(client: AsyncClient, seeded_alerts: Device):
+    """Test listing alerts, optionally unacknowledged only."""
+    response = await client.get("/api/v1/alerts")
+    assert response.status_code == 200
+    alerts = response.json()
+    assert len(alerts) == 3
+    assert set(alerts[0]) == set(AlertResponse.model_fields)
+    assert alerts[0]["device_id"] == seeded_alerts.id
+
+    response = await client.get("/api/v1/alerts?unacknowledged_only=true")
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_acknowledge_all_alerts(client: AsyncClient, seeded_alerts: Device):
+    """Test that acknowledge-all reports only the alerts it changed."""
+    response = await client.patch("/api/v1/alerts/acknowledge-all")
+    assert response.status_code == 200
+    assert response.json() == {"acknowledged": 2}
+
+
+@pytest.mark.asyncio
+async def test_list_device_alerts(client: AsyncClient, seeded_alerts: Device):
+    """Test listing alerts for a single device."""
+    response = await client.get(f"/api/v1/alerts/device/{seeded_alerts.id}")
+    assert response.status_code == 200
+    assert len(response.json()) == 3
+
+
+@pytest.mark.asyncio
+async def test_list_device_alerts_not_found(client: AsyncClient):
+    """Test listing alerts for a non-existent device."""
+    response = await client.get("/api/v1/alerts/device/99999")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_list_alerts_not_modified(client: AsyncClient, seeded_alerts: Device):
+    """Test that polling with a matching ETag returns 304 Not Modified."""
+    response = await client.get("/api/v1/alerts")
+    etag = response.headers["etag"]
+
+    response = await client.get("/api/v1/alerts", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+
+    # A different query is a different representation
+    response = await client.get(
+        "/api/v1/alerts?unacknowledged_only=true", headers={"If-None-Match": etag}
+    )
+    assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_alerts_etag_tracks_listed_rows(
+    client: AsyncClient, db_session: AsyncSession, seeded_alerts: Device
+):
+    """Test that the ETag changes when a listed alert is acknowledged."""
+    response = await client.get("/api/v1/alerts?limit=2")
+    etag = response.headers["etag"]
+    listed = response.json()
+    unacknowledged = next(alert for alert in listed if not alert["is_acknowledged"])
+
+    alert = await db_session.get(Alert, unacknowledged["id"])
+    alert.is_acknowledged = True
+    alert.acknowledged_at = datetime.now(timezone.utc)
+    await db_session.commit()
+
+    response = await client.get("/api/v1/alerts?limit=2", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+@pytest.mark.asyncio
+async def test_list_alerts_streamed(client: AsyncClient, seeded_alerts: Device):
+    """Test that large limits stream the same JSON array."""
+    response = await client.get("/api/v1/alerts?limit=1000")
+    assert response.status_code == 200
+    assert "etag" in response.headers
+    alerts = response.json()
+    assert len(alerts) == 3
+    assert set(alerts[0]) == set(AlertResponse.model_fields)
@@ -1,8 +1,12 @@
 """Unit tests for auth endpoints."""
 
+import time
+
 import pytest
 from httpx import AsyncClient
 
+from app.services import auth
+
 
 @pytest.mark.asyncio
 async def test_register_user(client: AsyncClient):
@@ -101,3 +105,22 @@ async def test_refresh_token(client: AsyncClient):
     data = response.json()
     assert "access_token" in data
     assert "refresh_token" in data
+
+
+def test_verify_token_cached():
+    """Test that verified tokens are cached but still honour type and exp."""
+    token = auth.create_access_token(42)
+    assert auth.verify_token(token) == 42
+    assert auth.verify_token(token) == 42
+    assert auth.verify_token(token, token_type="refresh") is None
+    assert auth.verify_token("not-a-token") is None
+
+
+def test_verify_token_cached_expiry(monkeypatch):
+    """Test that a cached token stops verifying once its exp has passed."""
+    token = auth.create_access_token(7)
+    assert auth.verify_token(token) == 7
+
+    expired = time.time() + auth.ACCESS_TOKEN_EXPIRE.total_seconds() + 1
+    monkeypatch.setattr(auth.time, "time", lambda: expired)
+    assert auth.verify_token(token) is None
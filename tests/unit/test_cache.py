@@ -0,0 +1,63 @@
+"""Unit tests for the Redis response cache."""
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Device
+from app.services import cache
+
+
+class FakeRedis:
+    """In-memory stand-in for redis.asyncio.Redis."""
+
+    def __init__(self):
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key):
+        return self.data.get(key)
+
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+@pytest.fixture
+def fake_redis(monkeypatch) -> FakeRedis:
+    redis = FakeRedis()
+    monkeypatch.setattr(cache, "_redis", redis)
+    return redis
+
+
+@pytest.mark.asyncio
+async def test_list_devices_cached_until_mutation(
+    client: AsyncClient, db_session: AsyncSession, fake_redis: FakeRedis
+):
+    """Test that the device list is served from cache until a device changes."""
+    response = await client.get("/api/v1/devices")
+    assert response.json() == []
+    assert fake_redis.data[cache.DEVICES_LIST_KEY] == b"[]"
+
+    # Written behind the API's back: still served from cache
+    db_session.add(Device(device_id="cached-device", name="Cached"))
+    await db_session.commit()
+    response = await client.get("/api/v1/devices")
+    assert response.json() == []
+
+    # Creating a device through the API invalidates the cached list
+    await client.post("/api/v1/devices", json={"device_id": "new", "name": "New"})
+    assert cache.DEVICES_LIST_KEY not in fake_redis.data
+    response = await client.get("/api/v1/devices")
+    assert "cached-device" in [device["device_id"] for device in response.json()]
+
+
+@pytest.mark.asyncio
+async def test_cache_disabled_without_redis():
+    """Test that the helpers are no-ops when REDIS_URL is unset."""
+    assert cache._redis is None
+    await cache.set_cached("key", b"value", 10)
+    assert await cache.get_cached("key") is None
+    await cache.invalidate("key")
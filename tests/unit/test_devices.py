@@ -2,6 +2,10 @@
 
 import pytest
 from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Alert, AlertRule, Device, Telemetry, User
+from app.services.auth import create_access_token
 
 
 @pytest.mark.asyncio
@@ -125,3 +129,95 @@ async def test_create_alert_rule_invalid_range(client: AsyncClient):
     )
     assert response.status_code == 400
     assert "less than" in response.json()["detail"]
+
+
+@pytest.mark.asyncio
+async def test_list_device_rules(client: AsyncClient, db_session: AsyncSession):
+    """Test listing a device's rules with device_name, and the empty/404 cases."""
+    device = Device(device_id="rules-list", name="Rules List")
+    empty = Device(device_id="rules-empty", name="Rules Empty")
+    db_session.add_all([device, empty])
+    await db_session.flush()
+    db_session.add(AlertRule(device_id=device.id, temp_min=35.0, temp_max=39.0))
+    await db_session.commit()
+
+    response = await client.get(f"/api/v1/devices/{device.id}/rules")
+    assert response.status_code == 200
+    rules = response.json()
+    assert len(rules) == 1
+    assert rules[0]["device_name"] == "Rules List"
+
+    response = await client.get(f"/api/v1/devices/{empty.id}/rules")
+    assert response.status_code == 200
+    assert response.json() == []
+
+    response = await client.get("/api/v1/devices/99999/rules")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_create_alert_rule_device_not_found(client: AsyncClient):
+    """Test creating a rule for a non-existent device."""
+    response = await client.post(
+        "/api/v1/devices/99999/rules",
+        json={"temp_min": 35.0, "temp_max": 39.0},
+    )
+    assert response.status_code == 404
+
+    # An unknown device is reported before an invalid range
+    response = await client.post(
+        "/api/v1/devices/99999/rules",
+        json={"temp_min": 40.0, "temp_max": 35.0},
+    )
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_delete_alert_rule(client: AsyncClient, db_session: AsyncSession):
+    """Test deleting a rule, and a rule that doesn't exist."""
+    device = Device(device_id="rule-delete", name="Rule Delete")
+    db_session.add(device)
+    await db_session.flush()
+    rule = AlertRule(device_id=device.id, temp_min=35.0, temp_max=39.0)
+    db_session.add(rule)
+    await db_session.commit()
+
+    response = await client.delete(f"/api/v1/devices/{device.id}/rules/{rule.id}")
+    assert response.status_code == 204
+
+    response = await client.delete(f"/api/v1/devices/{device.id}/rules/99999")
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_delete_device_with_children(
+    client: AsyncClient, db_session: AsyncSession
+):
+    """Test deleting a device that has telemetry, rules and alerts."""
+    user = User(email="owner@example.com", hashed_password="x")
+    device = Device(device_id="delete-me", name="Delete Me")
+    db_session.add_all([user, device])
+    await db_session.flush()
+    rule = AlertRule(device_id=device.id, temp_min=35.0, temp_max=39.0)
+    db_session.add(rule)
+    await db_session.flush()
+    db_session.add_all(
+        [
+            Telemetry(device_id=device.id, temp_c=40.0, recorded_at=device.created_at),
+            Alert(
+                device_id=device.id,
+                rule_id=rule.id,
+                temp_c=40.0,
+                alert_type="high",
+                message="Too hot",
+            ),
+        ]
+    )
+    await db_session.commit()
+
+    headers = {"Authorization": f"Bearer {create_access_token(user.id)}"}
+    response = await client.delete(f"/api/v1/devices/{device.id}", headers=headers)
+    assert response.status_code == 204
+
+    response = await client.delete("/api/v1/devices/99999", headers=headers)
+    assert response.status_code == 404
@@ -3,6 +3,8 @@
 import pytest
 from httpx import AsyncClient
 
+from app.routers.health import STATIC_DIR
+
 
 @pytest.mark.asyncio
 async def test_health_check(client: AsyncClient):
@@ -12,3 +14,21 @@ async def test_health_check(client: AsyncClient):
     data = response.json()
     assert data["status"] == "healthy"
     assert "timestamp" in data
+
+
+@pytest.mark.asyncio
+async def test_favicon(client: AsyncClient):
+    """Test that the favicon is served from memory."""
+    response = await client.get("/favicon.ico")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "image/png"
+    assert response.content == (STATIC_DIR / "favicon.png").read_bytes()
+
+
+@pytest.mark.asyncio
+async def test_root_redirects_to_docs(client: AsyncClient):
+    """Test that the root URL redirects to the API docs."""
+    for _ in range(2):
+        response = await client.get("/")
+        assert response.status_code == 307
+        assert response.headers["location"] == "/docs"
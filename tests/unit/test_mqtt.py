@@ -0,0 +1,238 @@
+"""Unit tests for MQTT telemetry ingestion."""
+
+import asyncio
+from datetime import datetime, timezone
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Alert, AlertRule, Device, Telemetry
+from app.services import mqtt
+from app.services.mqtt import MQTTService, _pack_rules, parse_timestamp
+
+
+@pytest.mark.asyncio
+async def test_persist_batch(db_session: AsyncSession):
+    """Test that one batch registers devices, stores readings and fires alerts."""
+    device = Device(device_id="mqtt-known", name="Known")
+    db_session.add(device)
+    await db_session.flush()
+    db_session.add(AlertRule(device_id=device.id, temp_min=35.0, temp_max=39.0))
+    await db_session.commit()
+
+    now = datetime.now(timezone.utc)
+    batch = [
+        ("mqtt-known", 37.5, now),
+        ("mqtt-known", 40.0, now),
+        ("mqtt-new", 20.0, now),
+    ]
+    registered, alerts = await MQTTService()._persist_batch(db_session, batch)
+    await db_session.commit()
+
+    assert registered
+    assert alerts == [
+        ("mqtt-known", "high", 40.0, "Temperature 40.0°C is above maximum 39.0°C")
+    ]
+    assert await db_session.scalar(select(func.count()).select_from(Telemetry)) == 3
+    assert await db_session.scalar(select(func.count()).select_from(Alert)) == 1
+    assert await db_session.scalar(
+        select(Device.name).where(Device.device_id == "mqtt-new")
+    ) == "Auto-registered: mqtt-new"
+
+
+@pytest.mark.asyncio
+async def test_device_cache(db_session: AsyncSession):
+    """Test that resolved devices are cached until invalidated."""
+    service = MQTTService()
+    now = datetime.now(timezone.utc)
+    await service._persist_batch(db_session, [("mqtt-cached", 37.0, now)])
+    await db_session.commit()
+    pk = service._device_cache["mqtt-cached"]
+
+    # Cached devices are not registered again
+    registered, _ = await service._persist_batch(db_session, [("mqtt-cached", 37.0, now)])
+    await db_session.commit()
+    assert not registered
+    assert service._device_cache["mqtt-cached"] == pk
+
+    service.invalidate_device("mqtt-cached")
+    assert "mqtt-cached" not in service._device_cache
+
+
+@pytest.mark.asyncio
+async def test_rule_cache(db_session: AsyncSession):
+    """Test that rules are cached per device until invalidated."""
+    device = Device(device_id="mqtt-rules", name="Rules")
+    db_session.add(device)
+    await db_session.commit()
+
+    service = MQTTService()
+    now = datetime.now(timezone.utc)
+    batch = [("mqtt-rules", 45.0, now)]
+    _, alerts = await service._persist_batch(db_session, batch)
+    await db_session.commit()
+    assert alerts == []
+    assert service._rule_cache[device.id][0].size == 0
+
+    db_session.add(AlertRule(device_id=device.id, temp_min=35.0, temp_max=39.0))
+    await db_session.commit()
+    service.invalidate_rules(device.id)
+
+    _, alerts = await service._persist_batch(db_session, batch)
+    await db_session.commit()
+    assert [alert[1] for alert in alerts] == ["high"]
+
+
+def test_parse_timestamp():
+    """Test that device timestamps parse to aware UTC datetimes."""
+    assert parse_timestamp("2024-05-01T12:30:00Z") == datetime(
+        2024, 5, 1, 12, 30, tzinfo=timezone.utc
+    )
+    assert parse_timestamp("2024-05-01T12:30:00.250000Z").microsecond == 250000
+
+
+def test_check_alerts():
+    """Test that every reading is compared against every rule at once."""
+    rules = _pack_rules([(1, 35.0, 39.0), (2, 36.0, 40.0)])
+    hits = MQTTService()._check_alerts(np.array([37.0, 35.5, 39.5]), rules)
+    assert hits == [(1, 2, "low", 36.0), (2, 1, "high", 39.0)]
+
+
+def test_read_payload_bytes():
+    """Test that raw payload bytes are parsed without decoding them first."""
+    service = MQTTService()
+    payload = '{"device_id": "pod-é", "temp_c": 37.5}'.encode()
+    assert service._read_payload(payload, "topic-id") == ("pod-é", 37.5, None)
+    assert service._read_payload(b'{"temp_c": "36"}', "topic-id") == ("topic-id", 36.0, None)
+
+
+class FakeMessage:
+    """Stands in for an aiomqtt message."""
+
+    def __init__(self, topic: str, payload: bytes):
+        self.topic = SimpleNamespace(value=topic)
+        self.payload = payload
+
+
+@pytest.mark.asyncio
+async def test_handle_message_large_payload():
+    """Test that large payloads are parsed off the loop and still queued."""
+    service = MQTTService()
+    padding = "x" * 5000
+    payload = f'{{"temp_c": 37.5, "ts": "2024-05-01T12:30:00Z", "note": "{padding}"}}'
+    await service._handle_message(FakeMessage("egg/pod-1/telemetry", payload.encode()))
+
+    queued = [queue.get_nowait() for queue in service._queues if not queue.empty()]
+    assert queued == [
+        ("pod-1", 37.5, datetime(2024, 5, 1, 12, 30, tzinfo=timezone.utc))
+    ]
+
+
+@pytest.mark.asyncio
+async def test_handler_slot_released(monkeypatch):
+    """Test that a handled message frees its concurrency slot, even if invalid."""
+    monkeypatch.setattr(mqtt, "HANDLER_CONCURRENCY", 1)
+    service = MQTTService()
+    await service._handler_slots.acquire()
+    assert service._handler_slots.locked()
+
+    await service._handle_in_background(FakeMessage("egg/pod-1/telemetry", b"not json"))
+    assert not service._handler_slots.locked()
+
+
+@pytest.mark.asyncio
+async def test_flush_retries_with_fresh_caches(db_session: AsyncSession, monkeypatch):
+    """Test that a failed batch is retried once after clearing both caches."""
+    service = MQTTService()
+    service._device_cache["mqtt-stale"] = 99999
+    service._rule_cache[99999] = _pack_rules([(99999, 35.0, 39.0)])
+
+    persist = service._persist_batch
+    calls = []
+
+    async def fail_first(db, batch, resolve_all=False):
+        calls.append((dict(service._device_cache), resolve_all))
+        if len(calls) == 1:
+            raise RuntimeError("FOREIGN KEY constraint failed")
+        return await persist(db, batch, resolve_all)
+
+    monkeypatch.setattr(service, "_persist_batch", fail_first)
+    await service._flush(db_session, [("mqtt-stale", 40.0, datetime.now(timezone.utc))])
+
+    # The retry takes every device id from the registration upsert
+    assert calls[1] == ({}, True)
+    assert 99999 not in service._rule_cache
+    assert await db_session.scalar(select(func.count()).select_from(Telemetry)) == 1
+
+
+@pytest.mark.asyncio
+async def test_persist_batch_resolve_all(db_session: AsyncSession):
+    """Test that resolve_all ignores a stale cached id and upserts the device."""
+    device = Device(device_id="mqtt-existing", name="Existing")
+    db_session.add(device)
+    await db_session.commit()
+
+    service = MQTTService()
+    service._device_cache["mqtt-existing"] = 99999
+    service._device_cache["mqtt-deleted"] = 99998
+    now = datetime.now(timezone.utc)
+    await service._persist_batch(
+        db_session,
+        [("mqtt-existing", 37.0, now), ("mqtt-deleted", 37.0, now)],
+        resolve_all=True,
+    )
+    await db_session.commit()
+
+    assert service._device_cache["mqtt-existing"] == device.id
+    assert service._device_cache["mqtt-deleted"] != 99998
+    assert await db_session.scalar(
+        select(func.count()).select_from(Telemetry).where(Telemetry.device_id == device.id)
+    ) == 1
+
+
+@pytest.mark.asyncio
+async def test_rules_survive_cache_eviction(db_session: AsyncSession, monkeypatch):
+    """Test that loading one device's rules can't evict another's mid-batch."""
+    monkeypatch.setattr(mqtt, "RULE_CACHE_SIZE", 1)
+    device = Device(device_id="mqtt-evicted", name="Evicted")
+    db_session.add(device)
+    await db_session.flush()
+    db_session.add(AlertRule(device_id=device.id, temp_min=35.0, temp_max=39.0))
+    await db_session.commit()
+
+    service = MQTTService()
+    now = datetime.now(timezone.utc)
+    _, alerts = await service._persist_batch(db_session, [("mqtt-evicted", 45.0, now)])
+    await db_session.commit()
+    assert [alert[1] for alert in alerts] == ["high"]
+
+    # Loading the new device's rules evicts the cached ones from the full cache
+    _, alerts = await service._persist_batch(
+        db_session, [("mqtt-evicted", 45.0, now), ("mqtt-other", 37.0, now)]
+    )
+    await db_session.commit()
+    assert [alert[1] for alert in alerts] == ["high"]
+
+
+@pytest.mark.asyncio
+async def test_handle_message_keeps_topic_order():
+    """Test that a small message waits for a larger, offloaded one before it."""
+    service = MQTTService()
+    padding = "x" * 5000
+    large = f'{{"temp_c": 1.0, "note": "{padding}"}}'.encode()
+    small = b'{"temp_c": 2.0}'
+    await asyncio.gather(
+        service._handle_in_background(FakeMessage("egg/pod-1/telemetry", large)),
+        service._handle_in_background(FakeMessage("egg/pod-1/telemetry", small)),
+    )
+
+    queued = [
+        queue.get_nowait()[1]
+        for queue in service._queues
+        for _ in range(queue.qsize())
+    ]
+    assert queued == [1.0, 2.0]
+    assert service._topic_tails == {}
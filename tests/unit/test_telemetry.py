@@ -0,0 +1,170 @@
+"""Unit tests for telemetry endpoints."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Device, Telemetry
+from app.routers import telemetry
+
+
+@pytest.mark.asyncio
+async def test_get_device_telemetry(client: AsyncClient, db_session: AsyncSession):
+    """Test telemetry history only includes readings inside the window."""
+    device = Device(device_id="telemetry-test", name="Telemetry Test")
+    db_session.add(device)
+    await db_session.flush()
+
+    now = datetime.now(timezone.utc)
+    db_session.add_all(
+        [
+            Telemetry(device_id=device.id, temp_c=37.5, recorded_at=now),
+            Telemetry(
+                device_id=device.id, temp_c=36.0, recorded_at=now - timedelta(days=2)
+            ),
+        ]
+    )
+    await db_session.commit()
+
+    response = await client.get(f"/api/v1/devices/{device.id}/telemetry?hours=24")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["device_id"] == "telemetry-test"
+    assert data["device_name"] == "Telemetry Test"
+    assert data["count"] == 1
+    assert data["readings"][0]["temp_c"] == 37.5
+
+
+@pytest.mark.asyncio
+async def test_get_device_telemetry_empty(
+    client: AsyncClient, db_session: AsyncSession
+):
+    """Test telemetry history for a device with no readings."""
+    device = Device(device_id="telemetry-empty", name="Telemetry Empty")
+    db_session.add(device)
+    await db_session.commit()
+
+    response = await client.get(f"/api/v1/devices/{device.id}/telemetry")
+    assert response.status_code == 200
+    assert response.json()["readings"] == []
+    assert response.json()["count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_device_telemetry_not_found(client: AsyncClient):
+    """Test telemetry history for a non-existent device."""
+    response = await client.get("/api/v1/devices/99999/telemetry")
+    assert response.status_code == 404
+
+
+class FakeWebSocket:
+    """Records sent text frames; optionally never completes a send."""
+
+    def __init__(self, hang: bool = False):
+        self.hang = hang
+        self.sent: list[str] = []
+        self.close_code = None
+
+    async def send_text(self, data: str):
+        if self.hang:
+            await asyncio.sleep(3600)
+        self.sent.append(data)
+
+    async def close(self, code: int = 1000):
+        self.close_code = code
+
+
+@pytest.mark.asyncio
+async def test_broadcast_drops_slow_connections(monkeypatch):
+    """Test that a stalled client is dropped without blocking the others."""
+    monkeypatch.setattr(telemetry, "SEND_TIMEOUT", 0.01)
+    manager = telemetry.ConnectionManager()
+    fast, slow = FakeWebSocket(), FakeWebSocket(hang=True)
+    manager.active_connections["all"] = {fast, slow}
+
+    await manager.broadcast_bytes("all", b'{"type":"telemetry","temp_c":37.5}')
+    await manager.flush()
+
+    assert fast.sent == ['{"type":"batch","items":[{"type":"telemetry","temp_c":37.5}]}']
+    assert manager.active_connections["all"] == {fast}
+    # The dropped client is closed so it reconnects
+    assert slow.close_code == 1011
+    assert fast.close_code is None
+
+
+@pytest.mark.asyncio
+async def test_broadcast_all():
+    """Test that broadcast_all reaches every device's subscribers."""
+    manager = telemetry.ConnectionManager()
+    first, second = FakeWebSocket(), FakeWebSocket()
+    manager.active_connections = {"egg-01": {first}, "all": {second}}
+
+    await manager.broadcast_all({"type": "status"})
+
+    assert first.sent == second.sent == ['{"type":"status"}']
+
+
+@pytest.mark.asyncio
+async def test_disconnect_removes_empty_groups():
+    """Test that disconnecting the last socket removes the device group."""
+    manager = telemetry.ConnectionManager()
+    socket = FakeWebSocket()
+    manager.active_connections["egg-01"] = {socket}
+
+    manager.disconnect(socket, "egg-01")
+    manager.disconnect(socket, "egg-01")  # Already gone: no error
+
+    assert manager.active_connections == {}
+
+
+@pytest.mark.asyncio
+async def test_broadcasts_are_batched(monkeypatch):
+    """Test that broadcasts are coalesced into batch frames per device."""
+    monkeypatch.setattr(telemetry, "BATCH_MAX_SIZE", 3)
+    manager = telemetry.ConnectionManager()
+    socket = FakeWebSocket()
+    manager.active_connections["egg-01"] = {socket}
+
+    await manager.broadcast_to_device("egg-01", {"n": 1})
+    await manager.broadcast_to_device("egg-02", {"n": 0})  # No subscribers
+    await manager.broadcast_to_device("egg-01", {"n": 2})
+    assert socket.sent == []
+
+    await manager.flush()
+    assert socket.sent == ['{"type":"batch","items":[{"n":1},{"n":2}]}']
+
+    # A full batch is sent without waiting for the flusher
+    for n in range(3):
+        await manager.broadcast_to_device("egg-01", {"n": n})
+    assert len(socket.sent) == 2
+
+
+@pytest.mark.asyncio
+async def test_has_subscribers():
+    """Test subscriber checks follow connects and disconnects."""
+    manager = telemetry.ConnectionManager()
+    socket = FakeWebSocket()
+    assert not manager.has_subscribers("all")
+
+    manager.active_connections["all"] = {socket}
+    assert manager.has_subscribers("all")
+
+    manager.disconnect(socket, "all")
+    assert not manager.has_subscribers("all")
+
+
+@pytest.mark.asyncio
+async def test_broadcast_bytes():
+    """Test that pre-encoded messages are batched like dict messages."""
+    manager = telemetry.ConnectionManager()
+    socket = FakeWebSocket()
+    manager.active_connections["all"] = {socket}
+
+    await manager.broadcast_bytes("all", b'{"n":1}')
+    await manager.broadcast_to_device("all", {"n": 2})
+    await manager.flush()
+
+    assert socket.sent == ['{"type":"batch","items":[{"n":1},{"n":2}]}']
@@ -0,0 +1,92 @@
+"""Unit tests for admin user management endpoints."""
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models import Device, User
+from app.services.auth import create_access_token
+
+
+@pytest_asyncio.fixture
+async def admin(db_session: AsyncSession) -> User:
+    """Create the only admin user."""
+    user = User(
+        email="admin@example.com",
+        hashed_password="not-used",
+        is_superuser=True,
+    )
+    db_session.add(user)
+    await db_session.commit()
+    return user
+
+
+def auth_headers(user: User) -> dict:
+    """Bearer headers for a user."""
+    return {"Authorization": f"Bearer {create_access_token(user.id)}"}
+
+
+@pytest.mark.asyncio
+async def test_delete_last_admin_rejected(client: AsyncClient, admin: User):
+    """Test that the last admin cannot be deleted or demoted."""
+    response = await client.delete(
+        f"/api/v1/users/{admin.id}", headers=auth_headers(admin)
+    )
+    assert response.status_code == 400
+    assert "last admin" in response.json()["detail"]
+
+    response = await client.patch(
+        f"/api/v1/users/{admin.id}/toggle-admin", headers=auth_headers(admin)
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_demote_admin_with_another_admin(
+    client: AsyncClient, db_session: AsyncSession, admin: User
+):
+    """Test that an admin can be demoted while another admin remains."""
+    other = User(email="other@example.com", hashed_password="x", is_superuser=True)
+    db_session.add(other)
+    await db_session.commit()
+
+    response = await client.patch(
+        f"/api/v1/users/{other.id}/toggle-admin", headers=auth_headers(admin)
+    )
+    assert response.status_code == 200
+    assert response.json()["is_superuser"] is False
+
+
+@pytest.mark.asyncio
+async def test_delete_user_not_found(client: AsyncClient, admin: User):
+    """Test deleting a non-existent user."""
+    response = await client.delete("/api/v1/users/99999", headers=auth_headers(admin))
+    assert response.status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_delete_user_with_devices(
+    client: AsyncClient, db_session: AsyncSession, admin: User
+):
+    """Test deleting a user who owns a device."""
+    user = User(email="owner@example.com", hashed_password="x")
+    db_session.add(user)
+    await db_session.flush()
+    db_session.add(Device(device_id="owned", name="Owned", owner_id=user.id))
+    await db_session.commit()
+
+    response = await client.delete(
+        f"/api/v1/users/{user.id}", headers=auth_headers(admin)
+    )
+    assert response.status_code == 204
+
+
+@pytest.mark.asyncio
+async def test_list_users(client: AsyncClient, admin: User):
+    """Test listing users returns only UserResponse fields."""
+    response = await client.get("/api/v1/users", headers=auth_headers(admin))
+    assert response.status_code == 200
+    users = response.json()
+    assert [user["email"] for user in users] == ["admin@example.com"]
+    assert "hashed_password" not in users[0]